@@ -6,14 +6,83 @@ handling the complete evolution workflow from planning to implementation.
 """
 
 import asyncio
-from typing import Any, Dict, List
+import hashlib
+import re
+from functools import cached_property, lru_cache, partial
+from itertools import groupby
+from string import Formatter
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from crewai import Agent, Crew, Process, Task
 from crewai_tools import DirectoryReadTool, FileReadTool, FileWriterTool
 from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 
 from utils.logger import setup_logger
+from utils.response_cache import ResponseCache
+
+# Fallback role, goal, backstory and max_iter for each agent when the seed
+# configuration leaves them out
+AGENT_DEFAULTS = {
+    'planner': ('Strategic Planning Agent', 'Create comprehensive implementation plans', 'Expert software architect', 3),
+    'coder': ('Implementation Agent', 'Generate high-quality, maintainable code', 'Senior software engineer', 5),
+    'tester': ('Quality Assurance Agent', 'Ensure comprehensive test coverage', 'Testing specialist', 3),
+    'documenter': ('Documentation Agent', 'Maintain comprehensive documentation', 'Technical writer', 2),
+    'deployer': ('Deployment Agent', 'Handle deployment configurations', 'DevOps engineer', 2),
+    'evolver': ('System Evolution Agent', 'Continuously improve the AI system', 'Machine learning engineer', 2),
+    'triager': ('Failure Triage Agent', 'Distill failing workflow logs into actionable issues',
+                'Reliability engineer for CI/CD diagnostics', 2),
+}
+
+# Fenced code blocks are passed through prompt compression untouched
+_CODE_FENCE = re.compile(r'(```.*?```)', re.DOTALL)
+
+# Rule-based log reduction applied before logs reach the triager prompt
+_ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+_LOG_TIMESTAMP = re.compile(r'^\d{4}-\d{2}-\d{2}T[\d:.]+Z ?', re.MULTILINE)
+_PROGRESS_LINE = re.compile(r'^\s*(Downloading|Collecting|Building wheel|Installing collected|Requirement already satisfied)')
+_LINE_VOLATILE = re.compile(r'0x[0-9a-f]+|\d+')
+
+
+# Run-specific triage fields; the LLM sees this stand-in so its (cacheable)
+# report never quotes them, and _run_header() adds the real values instead
+_RUN_FIELDS = ('run_url', 'git_ref', 'commit_sha')
+_RUN_FIELD_STANDIN = '(see report header)'
+
+
+def _run_header(triage_input: Dict[str, Any]) -> str:
+    """Markdown line naming the run a triage report is posted for, or '' if none is given."""
+    parts = []
+    if triage_input.get('run_url'):
+        parts.append(f"**Run:** {triage_input['run_url']}")
+    if triage_input.get('git_ref'):
+        parts.append(f"**Ref:** `{triage_input['git_ref']}`")
+    if triage_input.get('commit_sha'):
+        parts.append(f"**Commit:** `{triage_input['commit_sha']}`")
+    return ' | '.join(parts) + '\n\n' if parts else ''
+
+
+@lru_cache(maxsize=1)
+def _shared_tools() -> Tuple[Any, ...]:
+    """Tools shared by every agent of every CrewManager, created on first use."""
+    return (FileReadTool(), FileWriterTool(), DirectoryReadTool())
+
+
+@lru_cache(maxsize=256)
+def _template_fields(template: str) -> Tuple[str, ...]:
+    """Top-level names referenced by a str.format template, e.g. 'a' for '{a.b}'."""
+    return tuple({
+        field.split('.', 1)[0].split('[', 1)[0]
+        for _, field, _, _ in Formatter().parse(template)
+        if field
+    })
+
+
+@lru_cache(maxsize=256)
+def _format_cached(template: str, ctx_items: Tuple[Tuple[str, Any], ...]) -> str:
+    """Format a template from hashable (name, value) pairs."""
+    return template.format(**dict(ctx_items))
 
 
 class CrewManager:
@@ -35,7 +104,9 @@ class CrewManager:
         self.config = config
         self.mode = mode
         self.llm = self._initialize_llm()
-        self.agents = self._create_agents()
+        self._agent_factories = self._create_agent_factories()
+        self.agents: Dict[str, Agent] = {}
+        self._compression_cache: Dict[str, str] = {}
         
     def _initialize_llm(self):
         """Initialize the LLM based on configuration. Returns None if unavailable."""
@@ -63,197 +134,218 @@ class CrewManager:
             self.logger.warning(f"LLM initialization failed; falling back to no-LLM mode: {e}")
             return None
             
-    def _create_agents(self) -> Dict[str, Agent]:
-        """Create all specialized agents with their configurations. May be empty if no LLM."""
-        agents_config = self.config.get('agents', {})
-        agents: Dict[str, Agent] = {}
+    @property
+    def _verbose(self) -> bool:
+        """CrewAI prints full prompts and reasoning when verbose; only do so in debug mode."""
+        return bool(self.config.get('debug', False))
         
-        # If LLM is unavailable, only allow triage fallback without agents
-        if self.llm is None:
-            # Create no agents; run_triage_report will fallback
-            return agents
-        
-        # Common tools available to all agents
-        common_tools = [
-            FileReadTool(),
-            FileWriteTool(),
-            DirectoryReadTool()
-        ]
+    @cached_property
+    def _compressor(self) -> Optional[Any]:
+        """LLMLingua compressor, or None unless prompt_compression is enabled and installed."""
+        settings = self.config.get('llm_config', {}).get('prompt_compression') or {}
+        if not settings.get('enabled'):
+            return None
+            
+        try:
+            from llmlingua import PromptCompressor  # optional; pulls in torch
+            return PromptCompressor(model_name=settings.get('model'), use_llmlingua2=True)
+        except Exception as e:
+            self.logger.warning(f"Prompt compression unavailable; sending context uncompressed: {e}")
+            return None
+            
+    @cached_property
+    def _response_cache(self) -> Optional[ResponseCache]:
+        """Persistent cache of triage reports, or None unless enabled."""
+        settings = self.config.get('llm_config', {}).get('response_cache') or {}
+        if not settings.get('enabled'):
+            return None
+            
+        try:
+            return ResponseCache(
+                settings.get('path', '.cache/llm_responses.db'),
+                ttl_seconds=settings.get('ttl_hours', 168) * 3600
+            )
+        except Exception as e:
+            self.logger.warning(f"Response cache unavailable: {e}")
+            return None
+            
+    def _compress_text(self, text: str) -> str:
+        """Compress a large context block before it is embedded in a prompt.
         
-        # In 'triage' mode, only create triager agent
-        if self.mode == 'triage':
-            triager_config = agents_config.get('triager', {})
-            if triager_config:
-                agents['triager'] = Agent(
-                    role=triager_config.get('role', 'Failure Triage Agent'),
-                    goal=triager_config.get('goal', 'Distill failing workflow logs into actionable issues'),
-                    backstory=triager_config.get('backstory', 'Reliability engineer for CI/CD diagnostics'),
-                    tools=common_tools,
-                    llm=self.llm,
-                    verbose=True,
-                    allow_delegation=False,
-                    max_iter=2
-                )
-            return agents
-        
-        # Planner Agent
-        planner_config = agents_config.get('planner', {})
-        agents['planner'] = Agent(
-            role=planner_config.get('role', 'Strategic Planning Agent'),
-            goal=planner_config.get('goal', 'Create comprehensive implementation plans'),
-            backstory=planner_config.get('backstory', 'Expert software architect'),
-            tools=common_tools,
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
-        )
+        Text shorter than prompt_compression.min_chars is returned as is, fenced
+        code blocks are kept verbatim, and results are cached by content hash so
+        context shared by several tasks is only compressed once.
+        """
+        if self._compressor is None:
+            return text
+            
+        settings = self.config['llm_config']['prompt_compression']
+        if len(text) < settings.get('min_chars', 2000):
+            return text
+            
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        if digest not in self._compression_cache:
+            rate = settings.get('rate', 0.55)
+            self._compression_cache[digest] = ''.join(
+                part if i % 2 or not part.strip()
+                else self._compressor.compress_prompt(part, rate=rate, force_tokens=['\n', '.', ':'])['compressed_prompt']
+                for i, part in enumerate(_CODE_FENCE.split(text))
+            )
+        return self._compression_cache[digest]
         
-        # Coder Agent
-        coder_config = agents_config.get('coder', {})
-        agents['coder'] = Agent(
-            role=coder_config.get('role', 'Implementation Agent'),
-            goal=coder_config.get('goal', 'Generate high-quality, maintainable code'),
-            backstory=coder_config.get('backstory', 'Senior software engineer'),
-            tools=common_tools,
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False,
-            max_iter=5
-        )
+    def _compress_logs(self, text: str) -> str:
+        """Strip low-information content from CI logs before they are sent to the LLM.
         
-        # Tester Agent
-        tester_config = agents_config.get('tester', {})
-        agents['tester'] = Agent(
-            role=tester_config.get('role', 'Quality Assurance Agent'),
-            goal=tester_config.get('goal', 'Ensure comprehensive test coverage'),
-            backstory=tester_config.get('backstory', 'Testing specialist'),
-            tools=common_tools,
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
-        )
+        Removes ANSI escapes, timestamps and package-install progress lines,
+        collapses runs of identical lines, and keeps only the last line of each
+        signature (the line with addresses and numbers removed).
+        """
+        text = _LOG_TIMESTAMP.sub('', _ANSI_ESCAPE.sub('', text))
+        lines = (line for line in text.splitlines() if not _PROGRESS_LINE.match(line))
         
-        # Documenter Agent
-        documenter_config = agents_config.get('documenter', {})
-        agents['documenter'] = Agent(
-            role=documenter_config.get('role', 'Documentation Agent'),
-            goal=documenter_config.get('goal', 'Maintain comprehensive documentation'),
-            backstory=documenter_config.get('backstory', 'Technical writer'),
-            tools=common_tools,
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False,
-            max_iter=2
-        )
+        collapsed = []
+        for line, run in groupby(lines):
+            repeats = sum(1 for _ in run)
+            collapsed.append(f"{line} [x{repeats}]" if repeats > 1 else line)
+            
+        seen = set()
+        kept = []
+        for line in reversed(collapsed):
+            signature = _LINE_VOLATILE.sub('', line).strip()
+            if signature:
+                if signature in seen:
+                    continue
+                seen.add(signature)
+            kept.append(line)
+            
+        return '\n'.join(reversed(kept))
         
-        # Deployer Agent
-        deployer_config = agents_config.get('deployer', {})
-        agents['deployer'] = Agent(
-            role=deployer_config.get('role', 'Deployment Agent'),
-            goal=deployer_config.get('goal', 'Handle deployment configurations'),
-            backstory=deployer_config.get('backstory', 'DevOps engineer'),
-            tools=common_tools,
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False,
-            max_iter=2
-        )
+    def _create_agent_factories(self) -> Dict[str, Callable[[], Agent]]:
+        """Register a factory for each agent available in this mode. May be empty if no LLM.
+        
+        Agents are only built when first requested through _get_agent(), so a
+        triage run never pays for constructing the evolution crew.
+        """
+        agents_config = self.config.get('agents', {})
+        
+        # If LLM is unavailable, only allow triage fallback without agents
+        if self.llm is None:
+            return {}
+        
+        # In 'triage' mode, only the triager is available
+        names = ['triager'] if self.mode == 'triage' else list(AGENT_DEFAULTS)
         
-        # Evolver Agent
-        evolver_config = agents_config.get('evolver', {})
-        agents['evolver'] = Agent(
-            role=evolver_config.get('role', 'System Evolution Agent'),
-            goal=evolver_config.get('goal', 'Continuously improve the AI system'),
-            backstory=evolver_config.get('backstory', 'Machine learning engineer'),
-            tools=common_tools,
+        return {
+            name: partial(self._build_agent, name, agents_config.get(name, {}))
+            for name in names
+            # The triager is opt-in through its configuration block
+            if name != 'triager' or agents_config.get(name)
+        }
+        
+    def _build_agent(self, name: str, agent_config: Dict[str, Any]) -> Agent:
+        """Construct a single agent from its configuration block."""
+        role, goal, backstory, max_iter = AGENT_DEFAULTS[name]
+        return Agent(
+            role=agent_config.get('role', role),
+            goal=agent_config.get('goal', goal),
+            backstory=agent_config.get('backstory', backstory),
+            tools=list(_shared_tools()),
             llm=self.llm,
-            verbose=True,
+            verbose=self._verbose,
             allow_delegation=False,
-            max_iter=2
+            max_iter=max_iter
         )
         
-        # Failure Triager Agent
-        triager_config = agents_config.get('triager', {})
-        if triager_config:
-            agents['triager'] = Agent(
-                role=triager_config.get('role', 'Failure Triage Agent'),
-                goal=triager_config.get('goal', 'Distill failing workflow logs into actionable issues'),
-                backstory=triager_config.get('backstory', 'Reliability engineer for CI/CD diagnostics'),
-                tools=common_tools,
-                llm=self.llm,
-                verbose=True,
-                allow_delegation=False,
-                max_iter=2
-            )
+    def _has_agent(self, name: str) -> bool:
+        """Return True if the agent is built or can be built in this mode."""
+        return name in self.agents or name in self._agent_factories
         
-        return agents
+    def _get_agent(self, name: str) -> Agent:
+        """Return the named agent, building it on first access."""
+        agent = self.agents.get(name)
+        if agent is None:
+            agent = self.agents[name] = self._agent_factories[name]()
+        return agent
         
     def _create_tasks(self, workflow_input: Dict[str, Any]) -> List[Task]:
-        """Create tasks for the evolution workflow."""
-        agents_config = self.config.get('agents', {})
+        """Create tasks for the evolution workflow.
+        
+        Each description is only the agent's own prompt template; the planner
+        template already carries the issue and repository context. There is no
+        shared opening block: CrewAI sends each agent's role/backstory system
+        message before the task description, so requests from different agents
+        never share a cacheable prefix.
+        """
+        if 'repository_context' in workflow_input:
+            # Compressed once here, so every template that renders it gets the short form
+            workflow_input = {
+                **workflow_input,
+                'repository_context': self._compress_text(str(workflow_input['repository_context']))
+            }
         
         # Planning Task
         planning_task = Task(
-            description=self._format_prompt(
-                agents_config.get('planner', {}).get('prompt_template', ''),
-                workflow_input
-            ),
-            agent=self.agents['planner'],
+            description=self._agent_prompt('planner', workflow_input),
+            agent=self._get_agent('planner'),
             expected_output="Detailed implementation plan in structured format with task breakdown, file impact assessment, and testing strategy"
         )
         
         # Implementation Task
         implementation_task = Task(
-            description=self._format_prompt(
-                agents_config.get('coder', {}).get('prompt_template', ''),
-                {**workflow_input, 'plan': '{planning_task_output}'}
-            ),
-            agent=self.agents['coder'],
+            description=self._agent_prompt('coder', {**workflow_input, 'plan': '{planning_task_output}'}),
+            agent=self._get_agent('coder'),
             expected_output="Complete code implementation with proper error handling, type hints, and documentation",
             context=[planning_task]
         )
         
+        implementation_input = {**workflow_input, 'implementation': '{implementation_task_output}'}
+        
         # Testing Task
         testing_task = Task(
-            description=self._format_prompt(
-                agents_config.get('tester', {}).get('prompt_template', ''),
-                {**workflow_input, 'implementation': '{implementation_task_output}'}
-            ),
-            agent=self.agents['tester'],
+            description=self._agent_prompt('tester', implementation_input),
+            agent=self._get_agent('tester'),
             expected_output="Comprehensive test suite with unit tests, integration tests, and edge case coverage",
             context=[implementation_task]
         )
         
         # Documentation Task
         documentation_task = Task(
-            description=self._format_prompt(
-                agents_config.get('documenter', {}).get('prompt_template', ''),
-                {**workflow_input, 'implementation': '{implementation_task_output}'}
-            ),
-            agent=self.agents['documenter'],
+            description=self._agent_prompt('documenter', implementation_input),
+            agent=self._get_agent('documenter'),
             expected_output="Updated documentation including API docs, user guides, and developer documentation",
             context=[implementation_task]
         )
         
         # Deployment Task
         deployment_task = Task(
-            description=self._format_prompt(
-                agents_config.get('deployer', {}).get('prompt_template', ''),
-                {**workflow_input, 'implementation': '{implementation_task_output}'}
-            ),
-            agent=self.agents['deployer'],
+            description=self._agent_prompt('deployer', implementation_input),
+            agent=self._get_agent('deployer'),
             expected_output="Deployment configuration updates and deployment scripts if needed",
             context=[implementation_task]
         )
         
         return [planning_task, implementation_task, testing_task, documentation_task, deployment_task]
         
+    def _agent_prompt(self, name: str, context: Dict[str, Any]) -> str:
+        """Format the named agent's prompt template with context variables."""
+        template = self.config.get('agents', {}).get(name, {}).get('prompt_template', '')
+        return self._format_prompt(template, context)
+        
     def _format_prompt(self, template: str, context: Dict[str, Any]) -> str:
-        """Format prompt template with context variables."""
+        """Format prompt template with context variables.
+        
+        Only the variables the template references form the cache key, so the
+        same template rendered from overlapping contexts is formatted once.
+        """
         try:
-            return template.format(**context)
+            ctx_items = tuple(
+                (name, context[name]) for name in sorted(_template_fields(template)) if name in context
+            )
+            try:
+                return _format_cached(template, ctx_items)
+            except TypeError:
+                # Unhashable values (dicts, lists) can't be cache keys
+                return template.format(**context)
         except KeyError as e:
             self.logger.warning(f"Missing context variable {e} in prompt template")
             return template
@@ -266,19 +358,14 @@ class CrewManager:
             # Create tasks for this workflow
             tasks = self._create_tasks(workflow_input)
             
-            # Create and configure the crew
-            crew = Crew(
-                agents=list(self.agents.values()),
-                tasks=tasks,
-                process=Process.sequential,
-                verbose=2
-            )
-            
-            # Execute the workflow
-            result = await asyncio.to_thread(crew.kickoff)
+            # Planning and implementation build on each other and run in order.
+            # The remaining tasks only depend on the implementation, so each
+            # runs in its own crew concurrently once it is done.
+            results = [await self._kickoff(tasks[:2])]
+            results += await asyncio.gather(*(self._kickoff([task]) for task in tasks[2:]))
             
             # Process and structure the results
-            workflow_result = self._process_crew_result(result, tasks)
+            workflow_result = self._process_crew_result(results, tasks)
             
             self.logger.info("CrewAI evolution workflow completed successfully")
             return workflow_result
@@ -296,8 +383,25 @@ class CrewManager:
                 "file_changes": []
             }
             
-    def _process_crew_result(self, result: Any, tasks: List[Task]) -> Dict[str, Any]:
-        """Process and structure CrewAI results."""
+    async def _kickoff(self, tasks: List[Task]) -> Any:
+        """Run tasks in order in a crew of the agents that own them."""
+        agents = [task.agent for task in tasks]
+        self.logger.info(f"Running crew: {', '.join(str(getattr(agent, 'role', agent)) for agent in agents)}")
+        crew = Crew(
+            agents=agents,
+            tasks=tasks,
+            process=Process.sequential,
+            verbose=self._verbose
+        )
+        return await asyncio.to_thread(crew.kickoff)
+        
+    def _process_crew_result(self, results: List[Any], tasks: List[Task]) -> Dict[str, Any]:
+        """Process and structure CrewAI results.
+        
+        `results` holds one output per crew run, in task order: the planning and
+        implementation crew first, then the testing, documentation and
+        deployment crews; full_result joins them all.
+        """
         return {
             "success": True,
             "planning_summary": self._extract_task_output(tasks[0]) if len(tasks) > 0 else "No planning performed",
@@ -305,22 +409,28 @@ class CrewManager:
             "testing_summary": self._extract_task_output(tasks[2]) if len(tasks) > 2 else "No testing performed",
             "documentation_summary": self._extract_task_output(tasks[3]) if len(tasks) > 3 else "No documentation updated",
             "deployment_notes": self._extract_task_output(tasks[4]) if len(tasks) > 4 else "No deployment configuration",
-            "file_changes": self._extract_file_changes(result),
-            "full_result": str(result)
+            "file_changes": self._extract_file_changes(results),
+            "full_result": "\n\n".join(str(result) for result in results)
         }
         
     def _extract_task_output(self, task: Task) -> str:
         """Extract meaningful output from a task result."""
         try:
-            if hasattr(task, 'output') and task.output:
-                return str(task.output)[:1000]  # Truncate for summary
+            output = getattr(task, 'output', None)
+            if output:
+                # CrewAI's TaskOutput keeps the text in .raw; slicing that avoids
+                # rendering the whole object just to keep its first 1000 chars
+                for text in (output, getattr(output, 'raw', None), getattr(output, 'result', None)):
+                    if isinstance(text, str):
+                        return text[:1000]  # Truncate for summary
+                return str(output)[:1000]
             return "Task completed but no detailed output available"
         except Exception as e:
             self.logger.warning(f"Could not extract task output: {e}")
             return "Task output extraction failed"
             
-    def _extract_file_changes(self, result: Any) -> List[Dict[str, Any]]:
-        """Extract file change information from workflow result."""
+    def _extract_file_changes(self, results: List[Any]) -> List[Dict[str, Any]]:
+        """Extract file change information from the workflow's crew results."""
         # This is a placeholder - in a real implementation, you'd parse
         # the actual file operations performed by the agents
         return [
@@ -340,19 +450,12 @@ class CrewManager:
                     self.config.get('agents', {}).get('evolver', {}).get('prompt_template', ''),
                     evolution_data
                 ),
-                agent=self.agents['evolver'],
+                agent=self._get_agent('evolver'),
                 expected_output="Analysis of evolution cycle with specific recommendations for system improvements"
             )
             
             # Execute evolution analysis
-            crew = Crew(
-                agents=[self.agents['evolver']],
-                tasks=[evolution_task],
-                process=Process.sequential,
-                verbose=2
-            )
-            
-            result = await asyncio.to_thread(crew.kickoff)
+            result = await self._kickoff([evolution_task])
             
             # Store insights for future improvements
             await self._store_evolution_insights(result)
@@ -375,17 +478,41 @@ class CrewManager:
         Returns:
             Markdown string suitable for a GitHub Issue body.
         """
-        if self.llm is None or 'triager' not in self.agents:
+        if self.llm is None or not self._has_agent('triager'):
             self.logger.warning("Triager unavailable (no LLM or agent not configured); returning raw logs excerpt")
             return triage_input.get('logs_excerpt', '')[:5000]
         
-        triager_template = self.config.get('agents', {}).get('triager', {}).get('prompt_template', '')
-        description = self._format_prompt(triager_template, triage_input)
-        triage_task = Task(
-            description=description,
-            agent=self.agents['triager'],
-            expected_output="Markdown report summarizing failure, with root causes and proposed fixes"
-        )
-        crew = Crew(agents=[self.agents['triager']], tasks=[triage_task], process=Process.sequential, verbose=2)
-        result = await asyncio.to_thread(crew.kickoff)
-        return str(result) if result else "Failed to generate triage report. See logs excerpt above."
+        # Recurring failures differ only in volatile details, which the cache normalizes away
+        cache_text = f"{triage_input.get('workflow_name', '')}\n{triage_input.get('logs_excerpt', '')}"
+        header = _run_header(triage_input)
+        cached = self._response_cache and self._response_cache.get('triage', cache_text)
+        if cached:
+            self.logger.info("Reusing cached triage report for a matching failure")
+            return header + cached
+        
+        logs_excerpt = self._compress_logs(triage_input.get('logs_excerpt', ''))
+        triage_input = {
+            **triage_input,
+            **dict.fromkeys(_RUN_FIELDS, _RUN_FIELD_STANDIN),
+            'logs_excerpt': self._compress_text(logs_excerpt)
+        }
+        
+        # A single prompt needs no crew orchestration; call the LLM directly
+        triager_config = self.config.get('agents', {}).get('triager', {})
+        role, goal, backstory, _ = AGENT_DEFAULTS['triager']
+        messages = [
+            SystemMessage(content=(
+                f"You are a {triager_config.get('role', role)}. Your goal: {triager_config.get('goal', goal)}.\n"
+                f"{triager_config.get('backstory', backstory)}"
+            )),
+            HumanMessage(content=self._format_prompt(triager_config.get('prompt_template', ''), triage_input))
+        ]
+        response = await self.llm.ainvoke(messages)
+        result = response.content
+        if not result:
+            return "Failed to generate triage report. See logs excerpt above."
+            
+        report = str(result)
+        if self._response_cache:
+            self._response_cache.set('triage', cache_text, report)
+        return header + report
@@ -5,25 +5,177 @@ This module provides utilities for AI agents to interact with GitHub APIs,
 including repository operations, issue management, and pull request creation.
 """
 
+import asyncio
 import base64
 import os
-from typing import Any, Dict, List, Optional
+import re
+import time
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 
-import requests
+import httpx
+
+try:
+    import ijson  # optional; lets large trees be parsed as they stream in
+except ImportError:
+    ijson = None
+
+try:
+    from orjson import loads as _loads
+except ImportError:  # minimal installs fall back to the stdlib parser
+    from json import loads as _loads
 
 from utils.logger import setup_logger
 
+# Files whose contents are shared with agents as repository context
+KEY_FILES = ('README.md', 'requirements.txt', 'pyproject.toml', 'setup.py')
+
+# Number of commits fetched up front by get_bootstrap_context()
+BOOTSTRAP_COMMIT_COUNT = 10
+
+# Substrings that mark a (lowercased) path as documentation, matched in one
+# regex scan rather than one substring search per indicator
+DOC_INDICATORS = ('doc', 'readme', '.md')
+_DOC_PATTERN = re.compile('|'.join(map(re.escape, DOC_INDICATORS)))
+
+
+def _json(response: httpx.Response) -> Any:
+    """Decode a JSON response body with the fastest available parser."""
+    return _loads(response.content)
+
+
+class _ThrottledTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that keeps concurrent API use within GitHub's limits.
+    
+    Caps in-flight requests with a semaphore, spaces request starts to at most
+    requests_per_second, and retries rate-limited responses (429, or 403 with
+    Retry-After / an exhausted X-RateLimit-Remaining) after the advertised wait.
+    """
+    
+    # Longest rate-limit wait worth sleeping through before giving up
+    MAX_RETRY_WAIT = 60.0
+    
+    def __init__(
+        self,
+        inner: httpx.AsyncBaseTransport,
+        max_concurrency: int,
+        requests_per_second: float,
+        max_retries: int,
+        logger: Any
+    ):
+        self._inner = inner
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._slot_lock = asyncio.Lock()
+        self._max_retries = max_retries
+        self._logger = logger
+        
+    async def _wait_for_slot(self) -> None:
+        """Sleep until this request's turn under the requests-per-second budget."""
+        async with self._slot_lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+            
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        """Seconds to wait before retrying a rate-limited response, else None."""
+        if response.status_code not in (403, 429):
+            return None
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+            try:
+                # RFC 9110 also allows an HTTP-date
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass  # unparseable; fall back to the default backoff
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            return max(0.0, float(response.headers.get('X-RateLimit-Reset', 0)) - time.time())
+        return 1.0 if response.status_code == 429 else None
+        
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self._max_retries + 1):
+            async with self._semaphore:
+                await self._wait_for_slot()
+                response = await self._inner.handle_async_request(request)
+                
+            wait = self._retry_after(response)
+            if wait is None or attempt == self._max_retries or wait > self.MAX_RETRY_WAIT:
+                return response
+                
+            self._logger.warning(f"GitHub rate limit hit; retrying {request.url.path} in {wait:.1f}s")
+            await response.aclose()
+            await asyncio.sleep(wait)
+        return response
+        
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+@dataclass
+class TreeSummary:
+    """Aggregates collected from a single pass over a git tree."""
+    folders: set = field(default_factory=set)
+    ext_counts: Counter = field(default_factory=Counter)
+    test_files: List[str] = field(default_factory=list)
+    doc_files: List[str] = field(default_factory=list)
+
+
+# One GraphQL round-trip for the context that would otherwise take a REST call
+# per key file plus one for commits. Blob aliases map back to KEY_FILES by index.
+_BOOTSTRAP_QUERY = """
+query($owner: String!, $name: String!, $commits: Int!) {
+  repository(owner: $owner, name: $name) {
+%s
+    ref(qualifiedName: "refs/heads/main") {
+      target {
+        ... on Commit {
+          history(first: $commits) {
+            nodes { oid messageHeadline authoredDate author { name } }
+          }
+        }
+      }
+    }
+  }
+}
+""" % "\n".join(
+    f'    file{i}: object(expression: "main:{name}") {{ ... on Blob {{ text }} }}'
+    for i, name in enumerate(KEY_FILES)
+)
+
 
 class GitHubIntegration:
     """
     Handles GitHub API interactions for the AI agent system.
     
     Provides methods for repository operations, branch management,
-    file operations, and pull request workflows.
+    file operations, and pull request workflows. Instances with the same
+    token and limits share one pooled HTTP/2 client per event loop, so
+    connections stay warm across instances; use as an async context
+    manager or call close().
     """
     
-    def __init__(self, config: Dict[str, Any]):
-        """Initialize GitHub integration with configuration."""
+    # Open clients per event loop, keyed by _client_key; entries go away with the loop
+    _clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, httpx.AsyncClient]]" = (
+        weakref.WeakKeyDictionary()
+    )
+    
+    def __init__(self, config: Dict[str, Any], transport: Optional[httpx.AsyncBaseTransport] = None):
+        """Initialize GitHub integration with configuration.
+        
+        Args:
+            config: Seed configuration
+            transport: Optional httpx transport override (used by tests)
+        """
         self.logger = setup_logger(__name__)
         self.config = config
         self.token = os.getenv('GITHUB_TOKEN')
@@ -37,8 +189,106 @@ class GitHubIntegration:
             'Accept': 'application/vnd.github.v3+json',
             'Content-Type': 'application/json'
         }
+        github_config = config.get('integrations', {}).get('github', {}) or {}
+        self._transport = transport
+        self._limits = (
+            int(github_config.get('max_concurrency', 8)),
+            float(github_config.get('requests_per_second', 10)),
+            int(github_config.get('max_retries', 2)),
+            float(github_config.get('keepalive_seconds', 60)),
+        )
+        self._client_key = (self.token, self._limits, transport)
+        
+        # In-memory caches so repeated context lookups within a workflow
+        # don't hit the API again; entries expire after cache_ttl seconds.
+        self.cache_ttl = float(github_config.get('cache_ttl_seconds', 300))
+        self._tree_cache: Dict[Tuple[str, str, str], Tuple[float, str, Dict[str, Any], TreeSummary]] = {}
+        self._file_cache: Dict[Tuple[str, str, str], Tuple[float, str]] = {}
+        self._tree_lock = asyncio.Lock()
+        self._bootstrap: Optional[Dict[str, Any]] = None
+        self._bootstrap_lock = asyncio.Lock()
+        self._repo: Optional[Tuple[str, str]] = None
+        # Last 200 response per URL, revalidated with its ETag by _get()
+        self._etags: Dict[str, Tuple[str, httpx.Response]] = {}
+        
+    @property
+    def _client(self) -> httpx.AsyncClient:
+        """The shared client for the running event loop, created on first use.
+        
+        Clients (and the throttle's asyncio primitives) are bound to the loop
+        they were created on, so each loop gets its own.
+        """
+        clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        client = clients.get(self._client_key)
+        if client is None or client.is_closed:
+            max_concurrency, requests_per_second, max_retries, keepalive = self._limits
+            # The throttle never has more than max_concurrency requests in
+            # flight, so the pool is sized to match. Idle connections are kept
+            # past httpx's 5s default so the TLS handshake is not repeated
+            # between workflow steps separated by long LLM calls.
+            limits = httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+                keepalive_expiry=keepalive
+            )
+            client = clients[self._client_key] = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(30.0),
+                transport=_ThrottledTransport(
+                    self._transport or httpx.AsyncHTTPTransport(http2=True, limits=limits),
+                    max_concurrency=max_concurrency,
+                    requests_per_second=requests_per_second,
+                    max_retries=max_retries,
+                    logger=self.logger
+                )
+            )
+        return client
+        
+    async def close(self) -> None:
+        """Close this loop's shared HTTP client and its pooled connections.
+        
+        Other instances sharing the client open a new one on their next call.
+        """
+        clients = self._clients.get(asyncio.get_running_loop(), {})
+        client = clients.pop(self._client_key, None)
+        if client is not None:
+            await client.aclose()
+        
+    async def __aenter__(self) -> "GitHubIntegration":
+        """Enter the async context; the client opens on the first request."""
+        return self
+        
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Close the client when leaving the async context."""
+        await self.close()
+        
+    async def _get(self, url: str) -> httpx.Response:
+        """GET a URL, revalidating any earlier response with If-None-Match.
+        
+        A 304 is answered with the stored response; GitHub does not count
+        conditional requests that return 304 against the rate limit.
+        """
+        cached = self._etags.get(url)
+        headers = {'If-None-Match': cached[0]} if cached else None
+        response = await self._client.get(url, headers=headers)
+        
+        if response.status_code == 304 and cached:
+            return cached[1]
+        if response.status_code == 200 and response.headers.get('ETag'):
+            self._etags[url] = (response.headers['ETag'], response)
+        return response
+        
+    def _is_fresh(self, cached_at: float) -> bool:
+        """Return True if a cache entry stored at cached_at is still within the TTL."""
+        return time.monotonic() - cached_at < self.cache_ttl
         
     def _get_repo_info(self) -> tuple[str, str]:
+        """Return owner and repo, resolving them on first use."""
+        if self._repo is None:
+            self._repo = self._resolve_repo()
+        return self._repo
+        
+    def _resolve_repo(self) -> tuple[str, str]:
         """Extract owner and repo from environment or git context."""
         # Prefer explicit environment provided by GitHub Actions
         repo_env = os.getenv("GITHUB_REPOSITORY")  # format: owner/repo
@@ -67,80 +317,253 @@ class GitHubIntegration:
         # Fallback - these should be configured
         return "owner", "repo"
         
-    async def get_repository_structure(self) -> Dict[str, Any]:
-        """Get the repository structure for context."""
+    async def get_bootstrap_context(self) -> Dict[str, Any]:
+        """Fetch key files and recent commits in one GraphQL call.
+        
+        A successful result is memoized for the lifetime of this instance. Returns
+        an empty dict if the query fails, in which case callers fall back to REST;
+        failures aren't memoized, so the next call tries the query again.
+        """
+        async with self._bootstrap_lock:
+            if not self._bootstrap:
+                self._bootstrap = await self._fetch_bootstrap_context()
+            return self._bootstrap
+            
+    async def _fetch_bootstrap_context(self) -> Dict[str, Any]:
+        """Run the bootstrap GraphQL query and normalize it to the REST helper shapes."""
         owner, repo = self._get_repo_info()
         
         try:
-            url = f"{self.base_url}/repos/{owner}/{repo}/git/trees/main?recursive=1"
-            response = requests.get(url, headers=self.headers, timeout=30)
+            payload = {
+                "query": _BOOTSTRAP_QUERY,
+                "variables": {"owner": owner, "name": repo, "commits": BOOTSTRAP_COMMIT_COUNT}
+            }
+            response = await self._client.post(f"{self.base_url}/graphql", json=payload)
             
-            if response.status_code == 200:
-                tree_data = response.json()
-                return {
-                    "tree": tree_data.get("tree", []),
-                    "structure_summary": self._summarize_structure(tree_data.get("tree", []))
+            if response.status_code != 200:
+                self.logger.warning(f"GraphQL bootstrap failed: {response.status_code}")
+                return {}
+                
+            data = _json(response)
+            repository = (data.get("data") or {}).get("repository")
+            if data.get("errors") or not repository:
+                self.logger.warning(f"GraphQL bootstrap returned errors: {data.get('errors')}")
+                return {}
+                
+            key_files = {}
+            for i, filename in enumerate(KEY_FILES):
+                blob = repository.get(f"file{i}") or {}
+                if blob.get("text") is not None:
+                    key_files[filename] = blob["text"][:2000]  # Truncate for context
+                    
+            history = (((repository.get("ref") or {}).get("target") or {}).get("history") or {}).get("nodes", [])
+            recent_commits = [
+                {
+                    "sha": node["oid"][:8],
+                    "message": node["messageHeadline"],
+                    "author": (node.get("author") or {}).get("name"),
+                    "date": node["authoredDate"]
                 }
-            else:
-                self.logger.error(f"Failed to get repository structure: {response.status_code}")
-                return {"tree": [], "structure_summary": "Could not retrieve structure"}
+                for node in history
+            ]
+            
+            return {
+                "key_files": key_files,
+                "recent_commits": recent_commits
+            }
+            
+        except Exception as e:
+            self.logger.warning(f"Error running GraphQL bootstrap: {e}")
+            return {}
+            
+    async def get_repository_structure(self, ref: str = "main") -> Dict[str, Any]:
+        """Get the repository structure for context.
+        
+        Results are cached per (owner, repo, ref) for cache_ttl seconds. Concurrent
+        callers share a single request, and stale entries are revalidated with the
+        stored ETag so an unchanged tree costs a 304 instead of a full download.
+        """
+        structure, _ = await self._load_tree(ref)
+        return structure
+        
+    async def _load_tree(self, ref: str = "main") -> Tuple[Dict[str, Any], TreeSummary]:
+        """Return the (cached) repository structure together with its TreeSummary."""
+        owner, repo = self._get_repo_info()
+        cache_key = (owner, repo, ref)
+        
+        async with self._tree_lock:
+            cached = self._tree_cache.get(cache_key)
+            if cached and self._is_fresh(cached[0]):
+                return cached[2], cached[3]
+            return await self._fetch_repository_structure(cache_key, cached)
+            
+    async def _fetch_repository_structure(
+        self,
+        cache_key: Tuple[str, str, str],
+        cached: Optional[Tuple[float, str, Dict[str, Any], TreeSummary]]
+    ) -> Tuple[Dict[str, Any], TreeSummary]:
+        """Fetch the recursive git tree, revalidating a stale cache entry if present."""
+        owner, repo, ref = cache_key
+        
+        try:
+            url = f"{self.base_url}/repos/{owner}/{repo}/git/trees/{ref}?recursive=1"
+            headers = {'If-None-Match': cached[1]} if cached and cached[1] else None
+            
+            async with self._client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and cached:
+                    self._tree_cache[cache_key] = (time.monotonic(), *cached[1:])
+                    return cached[2], cached[3]
+                elif response.status_code == 200:
+                    tree, scan = await self._read_tree(response)
+                    structure = {
+                        "tree": tree,
+                        "structure_summary": self._format_summary(scan)
+                    }
+                    etag = response.headers.get('ETag', '')
+                    self._tree_cache[cache_key] = (time.monotonic(), etag, structure, scan)
+                    return structure, scan
+                else:
+                    self.logger.error(f"Failed to get repository structure: {response.status_code}")
+                    return {"tree": [], "structure_summary": "Could not retrieve structure"}, TreeSummary()
                 
         except Exception as e:
             self.logger.error(f"Error getting repository structure: {e}")
-            return {"tree": [], "structure_summary": f"Error: {e}"}
+            return {"tree": [], "structure_summary": f"Error: {e}"}, TreeSummary()
             
-    def _summarize_structure(self, tree: List[Dict[str, Any]]) -> str:
-        """Create a summary of the repository structure."""
-        folders = set()
-        file_types = {}
+    async def _read_tree(self, response: httpx.Response) -> Tuple[List[Dict[str, str]], TreeSummary]:
+        """Parse a streamed git tree response, classifying entries as they arrive.
+        
+        Only each entry's path and type are kept. With ijson installed the body is
+        parsed chunk by chunk instead of being buffered and decoded in one piece.
+        """
+        tree: List[Dict[str, str]] = []
+        scan = TreeSummary()
         
+        def add(items: List[Dict[str, Any]]) -> None:
+            for item in items:
+                entry = {"path": item["path"], "type": item["type"]}
+                tree.append(entry)
+                self._scan_item(scan, entry)
+                
+        if ijson is None:
+            add(_loads(await response.aread()).get("tree", []))
+            return tree, scan
+            
+        items = ijson.sendable_list()
+        parser = ijson.items_coro(items, 'tree.item')
+        async for chunk in response.aiter_bytes():
+            parser.send(chunk)
+            add(items)
+            del items[:]
+        parser.close()
+        add(items)
+        
+        return tree, scan
+        
+    def _scan_tree(self, tree: List[Dict[str, Any]]) -> TreeSummary:
+        """Collect folders, file types, test files and doc files in one pass."""
+        scan = TreeSummary()
         for item in tree:
-            if item.get('type') == 'tree':
-                folders.add(item.get('path', '').split('/')[0])
-            elif item.get('type') == 'blob':
-                path = item.get('path', '')
-                if '.' in path:
-                    ext = path.split('.')[-1]
-                    file_types[ext] = file_types.get(ext, 0) + 1
-                    
-        summary = f"Repository has {len(folders)} main directories: {', '.join(sorted(folders))}\n"
-        summary += f"File types: {', '.join([f'{ext}({count})' for ext, count in sorted(file_types.items())])}"
+            self._scan_item(scan, item)
+        return scan
+        
+    def _scan_item(self, scan: TreeSummary, item: Dict[str, Any]) -> None:
+        """Fold a single tree entry into a TreeSummary."""
+        path = item['path']
+        if item['type'] == 'tree':
+            scan.folders.add(path.split('/', 1)[0])
+            
+        # splitext only looks at the final path component, so dotted directory
+        # names and extensionless files don't produce bogus extensions
+        elif item['type'] == 'blob':
+            ext = os.path.splitext(path)[1][1:]
+            if ext:
+                scan.ext_counts[ext] += 1
+                
+        path_lower = path.lower()
+        if path.endswith(".py") and "test" in path_lower:
+            scan.test_files.append(path)
+        if _DOC_PATTERN.search(path_lower):
+            scan.doc_files.append(path)
+        
+    def _format_summary(self, scan: TreeSummary) -> str:
+        """Render a TreeSummary as the human-readable structure summary."""
+        summary = f"Repository has {len(scan.folders)} main directories: {', '.join(sorted(scan.folders))}\n"
+        summary += f"File types: {', '.join([f'{ext}({count})' for ext, count in sorted(scan.ext_counts.items())])}"
         
         return summary
         
+    def _summarize_structure(self, tree: List[Dict[str, Any]]) -> str:
+        """Create a summary of the repository structure."""
+        return self._format_summary(self._scan_tree(tree))
+        
     async def get_key_files(self) -> Dict[str, str]:
-        """Get contents of key files for context."""
-        key_files = ['README.md', 'requirements.txt', 'pyproject.toml', 'setup.py']
+        """Get contents of key files for context.
+        
+        Served from get_bootstrap_context() when available. Otherwise files are
+        fetched concurrently over REST; a missing or unreadable file is skipped
+        without affecting the others.
+        """
+        bootstrap = await self.get_bootstrap_context()
+        if bootstrap:
+            return dict(bootstrap["key_files"])
+            
         owner, repo = self._get_repo_info()
         
-        file_contents = {}
+        results = await asyncio.gather(
+            *(self._fetch_one_file(owner, repo, filename) for filename in KEY_FILES),
+            return_exceptions=True
+        )
         
-        for filename in key_files:
-            try:
-                url = f"{self.base_url}/repos/{owner}/{repo}/contents/{filename}"
-                response = requests.get(url, headers=self.headers, timeout=30)
-                
-                if response.status_code == 200:
-                    file_data = response.json()
-                    if file_data.get('encoding') == 'base64':
-                        content = base64.b64decode(file_data['content']).decode('utf-8')
-                        file_contents[filename] = content[:2000]  # Truncate for context
-                        
-            except Exception as e:
-                self.logger.warning(f"Could not read {filename}: {e}")
+        file_contents = {}
+        for filename, result in zip(KEY_FILES, results):
+            if isinstance(result, BaseException):
+                self.logger.warning(f"Could not read {filename}: {result}")
+            elif result[1] is not None:
+                file_contents[filename] = result[1]
                 
         return file_contents
         
+    async def _fetch_one_file(self, owner: str, repo: str, filename: str) -> Tuple[str, Optional[str]]:
+        """Fetch a single key file, returning (filename, truncated content or None)."""
+        cache_key = (owner, repo, filename)
+        cached = self._file_cache.get(cache_key)
+        if cached and self._is_fresh(cached[0]):
+            return filename, cached[1]
+            
+        url = f"{self.base_url}/repos/{owner}/{repo}/contents/{filename}"
+        response = await self._get(url)
+        
+        if response.status_code != 200:
+            return filename, None
+            
+        file_data = _json(response)
+        if file_data.get('encoding') != 'base64':
+            return filename, None
+            
+        content = base64.b64decode(file_data['content']).decode('utf-8')[:2000]  # Truncate for context
+        self._file_cache[cache_key] = (time.monotonic(), content)
+        return filename, content
+        
     async def get_recent_commits(self, count: int = 10) -> List[Dict[str, Any]]:
-        """Get recent commits for context."""
+        """Get recent commits for context.
+        
+        Served from get_bootstrap_context() when it covers count commits,
+        otherwise fetched over REST.
+        """
+        if count <= BOOTSTRAP_COMMIT_COUNT:
+            bootstrap = await self.get_bootstrap_context()
+            if bootstrap:
+                return bootstrap["recent_commits"][:count]
+                
         owner, repo = self._get_repo_info()
         
         try:
             url = f"{self.base_url}/repos/{owner}/{repo}/commits?per_page={count}"
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = await self._get(url)
             
             if response.status_code == 200:
-                commits = response.json()
+                commits = _json(response)
                 return [
                     {
                         "sha": commit["sha"][:8],
@@ -160,27 +583,13 @@ class GitHubIntegration:
             
     async def get_test_files(self) -> List[str]:
         """Get list of test files in the repository."""
-        structure = await self.get_repository_structure()
-        test_files = []
-        
-        for item in structure.get("tree", []):
-            path = item.get("path", "")
-            if "test" in path.lower() and path.endswith(".py"):
-                test_files.append(path)
-                
-        return test_files
+        _, scan = await self._load_tree()
+        return list(scan.test_files)
         
     async def get_documentation_files(self) -> List[str]:
         """Get list of documentation files."""
-        structure = await self.get_repository_structure()
-        doc_files = []
-        
-        for item in structure.get("tree", []):
-            path = item.get("path", "")
-            if any(doc_indicator in path.lower() for doc_indicator in ["doc", "readme", ".md"]):
-                doc_files.append(path)
-                
-        return doc_files
+        _, scan = await self._load_tree()
+        return list(scan.doc_files)
         
     async def create_branch(self, branch_name: str, base_branch: str = "main") -> bool:
         """Create a new branch for the evolution."""
@@ -189,13 +598,13 @@ class GitHubIntegration:
         try:
             # Get the SHA of the base branch
             url = f"{self.base_url}/repos/{owner}/{repo}/git/refs/heads/{base_branch}"
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = await self._client.get(url)
             
             if response.status_code != 200:
                 self.logger.error(f"Failed to get base branch SHA: {response.status_code}")
                 return False
                 
-            base_sha = response.json()["object"]["sha"]
+            base_sha = _json(response)["object"]["sha"]
             
             # Create the new branch
             url = f"{self.base_url}/repos/{owner}/{repo}/git/refs"
@@ -204,7 +613,7 @@ class GitHubIntegration:
                 "sha": base_sha
             }
             
-            response = requests.post(url, headers=self.headers, json=data, timeout=30)
+            response = await self._client.post(url, json=data)
             
             if response.status_code == 201:
                 self.logger.info(f"Successfully created branch: {branch_name}")
@@ -223,10 +632,10 @@ class GitHubIntegration:
         
         try:
             url = f"{self.base_url}/repos/{owner}/{repo}/pulls"
-            response = requests.post(url, headers=self.headers, json=pr_data, timeout=30)
+            response = await self._client.post(url, json=pr_data)
             
             if response.status_code == 201:
-                pr_info = response.json()
+                pr_info = _json(response)
                 self.logger.info(f"Successfully created PR #{pr_info['number']}: {pr_info['title']}")
                 return {
                     "success": True,
@@ -256,7 +665,7 @@ class GitHubIntegration:
             url = f"{self.base_url}/repos/{owner}/{repo}/issues/{issue_number}/comments"
             data = {"body": comment}
             
-            response = requests.post(url, headers=self.headers, json=data, timeout=30)
+            response = await self._client.post(url, json=data)
             
             if response.status_code == 201:
                 self.logger.info(f"Successfully commented on issue #{issue_number}")
@@ -269,42 +678,73 @@ class GitHubIntegration:
             self.logger.error(f"Error commenting on issue: {e}")
             return False
             
-    async def update_file(self, file_path: str, content: str, commit_message: str, branch: str) -> bool:
-        """Update or create a file in the repository."""
+    async def commit_files(self, branch: str, files: Dict[str, str], message: str) -> bool:
+        """Commit several files to a branch as a single commit.
+        
+        Uses the Git Data API, so the number of requests is fixed no matter how
+        many files change: read the branch head, create a tree on top of it with
+        the new contents inlined, create the commit, and move the branch ref.
+        
+        Args:
+            branch: Branch to commit to
+            files: Mapping of repository path to new (text) content
+            message: Commit message
+            
+        Returns:
+            True if the branch now points at the new commit
+        """
         owner, repo = self._get_repo_info()
+        repo_url = f"{self.base_url}/repos/{owner}/{repo}"
         
         try:
-            # Check if file exists to get SHA for updates
-            url = f"{self.base_url}/repos/{owner}/{repo}/contents/{file_path}?ref={branch}"
-            response = requests.get(url, headers=self.headers, timeout=30)
-            
-            file_sha = None
-            if response.status_code == 200:
-                file_sha = response.json().get("sha")
+            # Head commit and its tree in one call
+            response = await self._client.get(f"{repo_url}/commits/{branch}")
+            if response.status_code != 200:
+                self.logger.error(f"Failed to get head of {branch}: {response.status_code}")
+                return False
                 
-            # Update or create file
-            url = f"{self.base_url}/repos/{owner}/{repo}/contents/{file_path}"
-            data = {
-                "message": commit_message,
-                "content": base64.b64encode(content.encode()).decode(),
-                "branch": branch
-            }
-            
-            if file_sha:
-                data["sha"] = file_sha
+            head = _json(response)
+            tree = [
+                {"path": path, "mode": "100644", "type": "blob", "content": content}
+                for path, content in files.items()
+            ]
+            response = await self._client.post(
+                f"{repo_url}/git/trees",
+                json={"base_tree": head["commit"]["tree"]["sha"], "tree": tree}
+            )
+            if response.status_code != 201:
+                self.logger.error(f"Failed to create tree: {response.status_code} - {response.text}")
+                return False
                 
-            response = requests.put(url, headers=self.headers, json=data, timeout=30)
-            
-            if response.status_code in [200, 201]:
-                self.logger.info(f"Successfully updated file: {file_path}")
+            response = await self._client.post(
+                f"{repo_url}/git/commits",
+                json={"message": message, "tree": _json(response)["sha"], "parents": [head["sha"]]}
+            )
+            if response.status_code != 201:
+                self.logger.error(f"Failed to create commit: {response.status_code} - {response.text}")
+                return False
+                
+            response = await self._client.patch(
+                f"{repo_url}/git/refs/heads/{branch}",
+                json={"sha": _json(response)["sha"]}
+            )
+            if response.status_code == 200:
+                self.logger.info(f"Committed {len(files)} file(s) to {branch}")
                 return True
             else:
-                self.logger.error(f"Failed to update file: {response.status_code} - {response.text}")
+                self.logger.error(f"Failed to update {branch}: {response.status_code} - {response.text}")
                 return False
                 
         except Exception as e:
-            self.logger.error(f"Error updating file {file_path}: {e}")
+            self.logger.error(f"Error committing files to {branch}: {e}")
             return False
+            
+    async def update_file(self, file_path: str, content: str, commit_message: str, branch: str) -> bool:
+        """Update or create a file in the repository.
+        
+        Thin wrapper around commit_files(); prefer that when changing several files.
+        """
+        return await self.commit_files(branch, {file_path: content}, commit_message)
 
     async def find_open_issue_by_title(self, title: str, label: Optional[str] = None) -> Optional[int]:
         """Find an open issue by exact title, optionally filtered by a label. Returns issue number or None."""
@@ -314,9 +754,9 @@ class GitHubIntegration:
             if label:
                 params["labels"] = label
             url = f"{self.base_url}/repos/{owner}/{repo}/issues"
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
+            response = await self._client.get(url, params=params)
             if response.status_code == 200:
-                for issue in response.json():
+                for issue in _json(response):
                     if issue.get("title") == title:
                         return issue.get("number")
             else:
@@ -340,9 +780,9 @@ class GitHubIntegration:
             data = {"title": title, "body": body}
             if labels:
                 data["labels"] = labels
-            response = requests.post(url, headers=self.headers, json=data, timeout=30)
+            response = await self._client.post(url, json=data)
             if response.status_code == 201:
-                issue = response.json()
+                issue = _json(response)
                 self.logger.info(f"Created issue #{issue['number']}: {issue['title']}")
                 return {"success": True, "issue_number": issue["number"], "issue_url": issue["html_url"]}
             else:
@@ -10,22 +10,68 @@ import argparse
 import asyncio
 import logging
 import sys
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Dict, List
-
-import yaml
+from string import Template
+from typing import Any, Coroutine, Dict, List, Set, Tuple
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from agents.crew_manager import CrewManager
+# CrewManager pulls in CrewAI and the LLM clients, so it is imported in __init__
 from agents.github_integration import GitHubIntegration
+from utils.config_cache import load_config
 from utils.logger import setup_logger
 
+try:
+    from uvloop import new_event_loop as _loop_factory  # installed with uvicorn[standard]
+except ImportError:  # fall back to the default asyncio loop
+    _loop_factory = None
+
+
+# Pull request body, parsed once at import and filled by _generate_pr_description
+_PR_TEMPLATE = Template("""
+# AI Evolution: $title
+
+## 🎯 Original Request
+Resolves #$issue_number
+
+$body
+
+## 🤖 AI Implementation Summary
+
+### 📋 Planning Phase
+$planning_summary
+
+### 💻 Implementation
+$implementation_summary
+
+### 🧪 Testing
+$testing_summary
+
+### 📚 Documentation Updates
+$documentation_summary
+
+## 🔍 Files Changed
+$file_changes
 
-@dataclass
+## ✅ Quality Checks
+- [ ] All tests passing
+- [ ] Code coverage maintained
+- [ ] Documentation updated
+- [ ] Security scan passed
+- [ ] Performance impact assessed
+
+## 🚀 Deployment Notes
+$deployment_notes
+
+---
+*This PR was generated automatically by AI agents. Please review thoroughly before merging.*
+""")
+
+
+@dataclass(slots=True, frozen=True)
 class EvolutionRequest:
     """Data class representing an evolution request from a GitHub issue."""
     issue_number: int
@@ -33,7 +79,7 @@ class EvolutionRequest:
     body: str
     repository: str
     branch_name: str
-    labels: List[str] = None
+    labels: Tuple[str, ...] = ()
 
 
 class AgentOrchestrator:
@@ -49,14 +95,17 @@ class AgentOrchestrator:
         self.logger = setup_logger(__name__)
         self.config = self._load_config(config_path)
         self.github = GitHubIntegration(self.config)
+        
+        from agents.crew_manager import CrewManager  # lazy import to avoid heavy deps otherwise
         self.crew_manager = CrewManager(self.config)
         
+        # Follow-up work that does not gate the request outcome; see wait_for_background_tasks()
+        self._background_tasks: Set[asyncio.Task] = set()
+        
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from YAML file."""
         try:
-            config_file = project_root / config_path
-            with open(config_file, 'r') as f:
-                return yaml.safe_load(f)
+            return load_config(project_root / config_path)
         except Exception as e:
             self.logger.error(f"Failed to load config from {config_path}: {e}")
             raise
@@ -90,8 +139,8 @@ class AgentOrchestrator:
             # Step 4: Create pull request
             pr_result = await self._create_pull_request(request, workflow_result)
             
-            # Step 5: Post-process and learn
-            await self._post_process_evolution(request, workflow_result, pr_result)
+            # Step 5: Post-process and learn in the background; the PR is already open
+            self._run_in_background(self._post_process_evolution(request, workflow_result, pr_result))
             
             self.logger.info(f"Evolution process completed successfully for issue #{request.issue_number}")
             return True
@@ -101,18 +150,45 @@ class AgentOrchestrator:
             await self._handle_evolution_failure(request, str(e))
             return False
             
+    def _run_in_background(self, coro: Coroutine[Any, Any, None]) -> None:
+        """Schedule coro as a task that is tracked until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_task_done)
+        
+    def _background_task_done(self, task: asyncio.Task) -> None:
+        """Forget a finished background task, logging any error it raised."""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error(f"Background task failed: {task.exception()}")
+            
+    async def wait_for_background_tasks(self) -> None:
+        """Wait for outstanding background work such as evolution analysis."""
+        while self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+            
     async def _gather_repository_context(self, repository: str) -> Dict[str, Any]:
         """Gather comprehensive repository context for agents."""
         self.logger.info("Gathering repository context...")
         
-        context = {
-            "structure": await self.github.get_repository_structure(),
-            "key_files": await self.github.get_key_files(),
-            "recent_changes": await self.github.get_recent_commits(),
-            "existing_tests": await self.github.get_test_files(),
-            "documentation": await self.github.get_documentation_files(),
+        # The lookups are independent, so run them concurrently
+        sources = {
+            "structure": self.github.get_repository_structure(),
+            "key_files": self.github.get_key_files(),
+            "recent_changes": self.github.get_recent_commits(),
+            "existing_tests": self.github.get_test_files(),
+            "documentation": self.github.get_documentation_files(),
         }
+        results = await asyncio.gather(*sources.values(), return_exceptions=True)
         
+        context = {}
+        for key, result in zip(sources, results):
+            if isinstance(result, Exception):
+                # Degrade like the GitHub helpers do on API errors
+                self.logger.warning(f"Could not gather {key}: {result}")
+                result = {} if key in ("structure", "key_files") else []
+            context[key] = result
+            
         return context
         
     async def _execute_agent_workflow(self, request: EvolutionRequest, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -149,44 +225,18 @@ class AgentOrchestrator:
         
     def _generate_pr_description(self, request: EvolutionRequest, workflow_result: Dict[str, Any]) -> str:
         """Generate comprehensive PR description."""
-        return f"""
-# AI Evolution: {request.title}
-
-## 🎯 Original Request
-Resolves #{request.issue_number}
-
-{request.body}
-
-## 🤖 AI Implementation Summary
-
-### 📋 Planning Phase
-{workflow_result.get('planning_summary', 'No planning summary available')}
-
-### 💻 Implementation
-{workflow_result.get('implementation_summary', 'No implementation summary available')}
-
-### 🧪 Testing
-{workflow_result.get('testing_summary', 'No testing summary available')}
-
-### 📚 Documentation Updates
-{workflow_result.get('documentation_summary', 'No documentation summary available')}
-
-## 🔍 Files Changed
-{self._format_file_changes(workflow_result.get('file_changes', []))}
-
-## ✅ Quality Checks
-- [ ] All tests passing
-- [ ] Code coverage maintained
-- [ ] Documentation updated
-- [ ] Security scan passed
-- [ ] Performance impact assessed
-
-## 🚀 Deployment Notes
-{workflow_result.get('deployment_notes', 'Standard deployment process')}
-
----
-*This PR was generated automatically by AI agents. Please review thoroughly before merging.*
-"""
+        get = workflow_result.get
+        return _PR_TEMPLATE.substitute(
+            title=request.title,
+            issue_number=request.issue_number,
+            body=request.body,
+            planning_summary=get('planning_summary', 'No planning summary available'),
+            implementation_summary=get('implementation_summary', 'No implementation summary available'),
+            testing_summary=get('testing_summary', 'No testing summary available'),
+            documentation_summary=get('documentation_summary', 'No documentation summary available'),
+            file_changes=self._format_file_changes(get('file_changes', [])),
+            deployment_notes=get('deployment_notes', 'Standard deployment process')
+        )
         
     def _format_file_changes(self, file_changes: List[Dict[str, Any]]) -> str:
         """Format file changes for PR description."""
@@ -205,7 +255,7 @@ Resolves #{request.issue_number}
         
         # Trigger the evolver agent for system improvement
         evolution_data = {
-            "original_request": request.__dict__,
+            "original_request": asdict(request),
             "workflow_result": workflow_result,
             "pr_result": pr_result
         }
@@ -262,18 +312,17 @@ def main():
     # Initialize and run orchestrator
     orchestrator = AgentOrchestrator()
     
-    # Run async workflow
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    try:
-        success = loop.run_until_complete(orchestrator.process_evolution_request(request))
-        sys.exit(0 if success else 1)
-    except Exception as e:
-        logging.error(f"Orchestrator failed: {e}")
-        sys.exit(1)
-    finally:
-        loop.close()
+    # Run async workflow on one loop (uvloop when available)
+    with asyncio.Runner(loop_factory=_loop_factory) as runner:
+        try:
+            success = runner.run(orchestrator.process_evolution_request(request))
+            sys.exit(0 if success else 1)
+        except Exception as e:
+            logging.error(f"Orchestrator failed: {e}")
+            sys.exit(1)
+        finally:
+            runner.run(orchestrator.wait_for_background_tasks())
+            runner.run(orchestrator.github.close())
 
 
 if __name__ == "__main__":
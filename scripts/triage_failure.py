@@ -13,13 +13,14 @@ from __future__ import annotations
 import argparse
 import asyncio
 import os
+import re
 
 # Ensure repository root is on sys.path when running this file directly
 import sys
 from pathlib import Path
+from string import Template
 from typing import Any, Dict, List
 
-import yaml
 
 _REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(_REPO_ROOT) not in sys.path:
@@ -27,98 +28,217 @@ if str(_REPO_ROOT) not in sys.path:
 
 # Local imports (GitHubIntegration is lightweight)
 from agents.github_integration import GitHubIntegration  # noqa: E402
+from utils.config_cache import load_config  # noqa: E402
 from utils.logger import setup_logger  # noqa: E402
 
 logger = setup_logger(__name__)
 
 
 def tail_lines(text: str, n: int) -> str:
-    lines = text.splitlines()[-n:]
-    return "\n".join(lines)
+    """Return the last n lines of text (all of it for n <= 0), newline-joined.
 
+    Scans backwards for newlines instead of splitting every line, so the cost
+    depends on the size of the tail rather than the whole text.
+    """
+    end = len(text)
+    if text.endswith("\n"):
+        end -= 2 if text.endswith("\r\n") else 1
+    start = 0
+    if n > 0:
+        i = end
+        for _ in range(n):
+            i = text.rfind("\n", 0, i)
+            if i < 0:
+                break
+        else:
+            start = i + 1
+    tail = text[start:end]
+    return tail.replace("\r\n", "\n") if "\r" in tail else tail
+
+
+# Issue body for a failed run, parsed once and filled in main_async
+_ISSUE_BODY_TEMPLATE = Template(
+    "## CI Failure: $workflow_name\n\n"
+    "- Run: $run_url\n"
+    "- Ref: `$git_ref`\n"
+    "- Commit: `$commit_sha`\n\n"
+    "$report_md\n"
+    "$files_scanned_md"
+    "<details><summary>Logs Excerpts (last $tail lines per file)</summary>\n\n"
+    "$logs_details_md\n\n"
+    "</details>\n"
+)
+
+# GitHub rejects issue bodies over 65,536 characters; keep each section to a
+# share of MAX_BODY so the assembled body never needs a second attempt
+MAX_BODY = 60_000
+_BODY_BUDGETS = {"report": MAX_BODY // 3, "details": MAX_BODY // 2, "summary": MAX_BODY // 6}
+
+_CLIPPED = "\n\n<sub>(truncated)</sub>\n"
+
+
+def _clip(text: str, limit: int, sep: str = "\n") -> str:
+    """Trim text to at most `limit` characters, cutting before the last `sep` that fits.
+
+    Cutting on a separator keeps lines (or whole <details> blocks) intact; a
+    marker is appended so readers can tell content was dropped. A single line
+    longer than the budget is cut mid-way, but a block that doesn't fit is
+    dropped entirely, since cutting it would leave its fence and tags open.
+    """
+    if len(text) <= limit:
+        return text
+    room = max(0, limit - len(_CLIPPED))
+    cut = text.rfind(sep, 0, room)
+    if cut <= 0:
+        cut = room if sep == "\n" else 0
+    return text[:cut] + _CLIPPED
 
-def collect_logs_excerpt(root: Path, tail: int) -> tuple[str, str]:
-    """Collect *.txt and *.log logs under root, return (jobs_summary, excerpt_markdown)."""
-    if not root.exists():
-        return ("Logs root not found.", "No logs available.")
 
-    # Include both .txt (per-step logs) and .log files
-    txt_files: List[Path] = sorted(list(root.rglob("*.txt")) + list(root.rglob("*.log")))
-    if not txt_files:
-        return ("No log files found.", "No logs available.")
+# Most log text handed to the triager; larger excerpts mostly add cost, not signal
+EXCERPT_BUDGET = 60_000
 
-    parts: List[str] = []
-    job_lines: List[str] = []
-    max_per_file = 2_000_000  # 2MB safeguard to avoid huge payloads
-    for f in txt_files:
-        try:
-            content = f.read_text(errors="ignore")
-        except Exception:
-            continue
-        if len(content) > max_per_file:
-            content = content[-max_per_file:]
-        excerpt = tail_lines(content, tail)
-        rel = f.relative_to(root)
-        job_lines.append(f"- {rel}")
-        parts.append(f"===== {rel} =====\n{excerpt}\n")
-    return ("\n".join(job_lines), "\n".join(parts))
+# Per-step log files produced by the Actions log download
+_LOG_SUFFIXES = (".txt", ".log")
 
+# Initial read size per requested line when tailing a file; grown if lines are longer
+_TAIL_BYTES_PER_LINE = 512
 
-def build_logs_details_markdown(root: Path, tail: int, max_files: int = 25) -> str:
-    """Return a Markdown string with per-file <details> blocks containing the tail of each log.
 
-    This improves rendering in GitHub Issues versus one giant fenced block.
+def _read_tail(path: Path, tail: int) -> str:
+    """Return the last `tail` lines of a file, reading only the end of it.
+
+    Reads backwards from the end with positional reads (one pread per attempt,
+    no seek), widening the window until it holds more than `tail` newlines or
+    covers the whole file. A non-positive `tail` reads the entire file
+    (matching tail_lines).
     """
-    if not root.exists():
-        return "No logs directory found."
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        window = tail * _TAIL_BYTES_PER_LINE if tail > 0 else size
+        while True:
+            offset = max(0, size - window)
+            data = os.pread(fd, size - offset, offset)
+            if offset == 0 or data.count(b"\n") > tail:
+                break
+            window *= 4
+    finally:
+        os.close(fd)
+    return tail_lines(data.decode("utf-8", errors="ignore"), tail)
+
+
+def _find_log_files(root: Path) -> List[Path]:
+    """Return the *.txt and *.log files under root, sorted, from a single directory walk.
+
+    Large files are kept: _read_tail only reads their last lines, and the
+    biggest log is often the one with the failure.
+    """
+    return sorted(
+        Path(dirpath, name)
+        for dirpath, _, filenames in os.walk(root)
+        for name in filenames
+        if name.endswith(_LOG_SUFFIXES)
+    )
+
+
+async def _read_tails(files: List[Path], tail: int) -> List[Any]:
+    """Read the tails of several files concurrently; failed reads come back as exceptions."""
+    return await asyncio.gather(
+        *(asyncio.to_thread(_read_tail, f, tail) for f in files),
+        return_exceptions=True,
+    )
+
+
+_BACKTICK_RUN = re.compile(r"`{3,}")
+
+
+def _fence(text: str) -> str:
+    """Return a code fence longer than any backtick run in text.
+
+    A closing fence must be a bare run of at least the opening length, so
+    a longer fence keeps the log verbatim without escaping it.
+    """
+    if "```" not in text:
+        return "```"
+    return "`" * (max(map(len, _BACKTICK_RUN.findall(text))) + 1)
 
-    def _sanitize(md: str) -> str:
-        # Prevent accidental closing of fenced blocks inside logs
-        return md.replace("```", "``\`")
 
-    files: List[Path] = sorted(list(root.rglob("*.txt")) + list(root.rglob("*.log")))
+def _details_block(rel: Path, excerpt: str) -> str:
+    """Render one log tail as a collapsible <details> block."""
+    fence = _fence(excerpt)
+    return (
+        f"<details><summary>{rel}</summary>\n\n"
+        f"{fence}text\n{excerpt}\n{fence}\n\n"
+        f"</details>\n"
+    )
+
+
+async def scan_logs(root: Path, tail: int, max_files: int = 25) -> tuple[str, str, str]:
+    """Collect *.txt and *.log logs under root in a single pass.
+
+    Walks the tree once and reads each file's tail once, returning
+    (jobs_summary, excerpt, details_markdown). The excerpt covers every file,
+    so the fallback summary's hint scan sees all of them (only the triager's
+    copy is capped, at EXCERPT_BUDGET); the details Markdown holds per-file
+    <details> blocks for the first `max_files`, which renders better in
+    GitHub Issues than one giant fenced block.
+    """
+    if not root.exists():
+        return ("Logs root not found.", "No logs available.", "No logs directory found.")
+
+    # Include both .txt (per-step logs) and .log files; the walk runs off the
+    # event loop like the tail reads, so large artifact trees don't block it
+    files = await asyncio.to_thread(_find_log_files, root)
     if not files:
         # As a fallback, show any files present (may help diagnose unzip issues)
         others = sorted([p for p in root.rglob("*") if p.is_file()])
         if not others:
-            return "No log files available."
-        listing = "\n".join([f"- {p.relative_to(root)}" for p in others[:50]])
-        more = "" if len(others) <= 50 else f"\n... and {len(others) - 50} more files"
-        return f"No *.txt/*.log files found. Directory listing sample:\n{listing}{more}"
+            details_md = "No log files available."
+        else:
+            listing = "\n".join([f"- {p.relative_to(root)}" for p in others[:50]])
+            more = "" if len(others) <= 50 else f"\n... and {len(others) - 50} more files"
+            details_md = f"No *.txt/*.log files found. Directory listing sample:\n{listing}{more}"
+        return ("No log files found.", "No logs available.", details_md)
 
+    job_lines: List[str] = []
     parts: List[str] = []
-    shown = 0
-    max_per_file = 2_000_000
-    for f in files:
-        if shown >= max_files:
-            break
-        try:
-            content = f.read_text(errors="ignore")
-        except Exception:
+    details: List[str] = []
+    for i, (f, excerpt) in enumerate(zip(files, await _read_tails(files, tail))):
+        if isinstance(excerpt, BaseException):
             continue
-        if len(content) > max_per_file:
-            content = content[-max_per_file:]
-        excerpt = tail_lines(content, tail)
-        excerpt = _sanitize(excerpt)
         rel = f.relative_to(root)
-        parts.append(
-            (
-                f"<details><summary>{rel}</summary>\n\n"
-                f"```text\n{excerpt}\n```\n\n"
-                f"</details>\n"
-            )
-        )
-        shown += 1
+        job_lines.append(f"- {rel}")
+        parts.append(f"===== {rel} =====\n{excerpt}\n")
+        if i < max_files:
+            details.append(_details_block(rel, excerpt))
+
+    if len(details) < len(files):
+        details.append(f"\n<sub>Showing {len(details)} of {len(files)} files (last {tail} lines each).</sub>")
 
-    if shown < len(files):
-        parts.append(f"\n<sub>Showing {shown} of {len(files)} files (last {tail} lines each).</sub>")
+    return ("\n".join(job_lines), "\n".join(parts), "\n".join(details))
 
-    return "\n".join(parts)
+
+# Failure signatures for the fallback summary, one named group per category.
+# Case-sensitive on purpose: pytest prints a lowercase "collecting ..." line.
+_HINTS = re.compile(
+    r"(?P<dependency>pip install|Collecting|ModuleNotFoundError)"
+    r"|(?P<memory>MemoryError|Killed)"
+    r"|(?P<timeout>TimeoutError|timed out)"
+    r"|(?P<tests>AssertionError)"
+)
+_HINT_TEXT = {
+    "dependency": "Potential network or dependency issue",
+    "memory": "Runner ran out of memory",
+    "timeout": "Step or network call timed out",
+    "tests": "Failing test assertion",
+}
 
 
 def simple_summary(workflow_name: str, jobs_summary: str, excerpt: str, tail: int) -> str:
     """Produce a basic Markdown summary without LLMs."""
-    hint = "Potential network or dependency issue" if "pip install" in excerpt or "Collecting" in excerpt else "Check failing step"
+    # One scan of the excerpt; the earliest matching signature picks the hint
+    m = _HINTS.search(excerpt)
+    hint = _HINT_TEXT[m.lastgroup] if m else "Check failing step"
     return (
         f"### Auto-Triage Summary (fallback)\n\n"
         f"Workflow '{workflow_name}' failed.\n\n"
@@ -133,78 +253,83 @@ def simple_summary(workflow_name: str, jobs_summary: str, excerpt: str, tail: in
 
 
 async def main_async(args: argparse.Namespace) -> None:
-    # Load config
-    with open(Path("seed_instructions.yaml"), "r") as f:
-        config = yaml.safe_load(f)
+    # Load config off the event loop; repeat loads are served from load_config's cache
+    config = await asyncio.to_thread(load_config, "seed_instructions.yaml")
 
     failure_cfg = (config.get("workflow", {}) or {}).get("failure_reporting", {}) or {}
     tail = int(args.tail_lines or failure_cfg.get("logs_tail_lines", 200))
 
     # Prepare logs
     root = Path(args.logs_root).resolve()
-    jobs_summary, excerpt = collect_logs_excerpt(root, tail)
-    logs_details_md = build_logs_details_markdown(root, tail)
+    jobs_summary, excerpt, logs_details_md = await scan_logs(root, tail)
 
     # Initialize helpers
     gh = GitHubIntegration(config)
-
-    # Minimal repository context for the triager
-    repo_context = {
-        "structure": await gh.get_repository_structure(),
-        "recent_changes": await gh.get_recent_commits(),
-    }
-
-    triage_input: Dict[str, Any] = {
-        "workflow_name": args.workflow_name,
-        "run_url": args.run_url,
-        "git_ref": args.git_ref,
-        "commit_sha": args.commit_sha,
-        "failing_jobs_summary": jobs_summary,
-        "logs_excerpt": excerpt[:60000],  # avoid overly large payloads
-        "repository_context": repo_context,
-        "tail_lines": tail,
-    }
-
-    # Decide whether to use LLMs
-    have_llm = bool(os.getenv("OPENAI_API_KEY") or os.getenv("ANTHROPIC_API_KEY"))
-    if have_llm:
-        try:
-            from agents.crew_manager import (
-                CrewManager,  # lazy import to avoid heavy deps otherwise
-            )
-
-            crew = CrewManager(config, mode="triage")
-            report_md = await crew.run_triage_report(triage_input)
-        except Exception as e:
-            logger.warning(f"Triager unavailable, falling back to simple summary: {e}")
+    async with gh:
+        # Minimal repository context for the triager
+        structure, recent_changes = await asyncio.gather(
+            gh.get_repository_structure(),
+            gh.get_recent_commits(),
+        )
+        repo_context = {
+            "structure": structure,
+            "recent_changes": recent_changes,
+        }
+
+        triage_input: Dict[str, Any] = {
+            "workflow_name": args.workflow_name,
+            "run_url": args.run_url,
+            "git_ref": args.git_ref,
+            "commit_sha": args.commit_sha,
+            "failing_jobs_summary": jobs_summary,
+            "logs_excerpt": excerpt[:EXCERPT_BUDGET],  # avoid overly large payloads
+            "repository_context": repo_context,
+            "tail_lines": tail,
+        }
+
+        # Decide whether to use LLMs
+        have_llm = bool(os.getenv("OPENAI_API_KEY") or os.getenv("ANTHROPIC_API_KEY"))
+        if have_llm:
+            try:
+                from agents.crew_manager import (
+                    CrewManager,  # lazy import to avoid heavy deps otherwise
+                )
+
+                crew = CrewManager(config, mode="triage")
+                report_md = await crew.run_triage_report(triage_input)
+            except Exception as e:
+                logger.warning(f"Triager unavailable, falling back to simple summary: {e}")
+                report_md = simple_summary(args.workflow_name, jobs_summary, excerpt, tail)
+        else:
             report_md = simple_summary(args.workflow_name, jobs_summary, excerpt, tail)
-    else:
-        report_md = simple_summary(args.workflow_name, jobs_summary, excerpt, tail)
-
-    # Build issue content
-    title = f"[CI Failure] {args.workflow_name} on {args.git_ref} @ {args.commit_sha[:7]}"
-    files_scanned_md = (f"\n**Files scanned:**\n\n{jobs_summary}\n\n" if jobs_summary else "")
-    body = (
-        f"## CI Failure: {args.workflow_name}\n\n"
-        f"- Run: {args.run_url}\n"
-        f"- Ref: `{args.git_ref}`\n"
-        f"- Commit: `{args.commit_sha}`\n\n"
-        f"{report_md}\n"
-        f"{files_scanned_md}"
-        f"<details><summary>Logs Excerpts (last {tail} lines per file)</summary>\n\n"
-        f"{logs_details_md}\n\n"
-        f"</details>\n"
-    )
 
-    labels = failure_cfg.get("issue_labels", ["ci-failure", "triage"]) or []
-    dedupe = (labels[0] if labels else None)
+        # Build issue content
+        title = f"[CI Failure] {args.workflow_name} on {args.git_ref} @ {args.commit_sha[:7]}"
+        files_scanned_md = (
+            f"\n**Files scanned:**\n\n{_clip(jobs_summary, _BODY_BUDGETS['summary'])}\n\n"
+            if jobs_summary else ""
+        )
+        body = _ISSUE_BODY_TEMPLATE.substitute(
+            workflow_name=args.workflow_name,
+            run_url=args.run_url,
+            git_ref=args.git_ref,
+            commit_sha=args.commit_sha,
+            report_md=_clip(report_md, _BODY_BUDGETS["report"]),
+            files_scanned_md=files_scanned_md,
+            tail=tail,
+            # Drop whole blocks so no <details> or code fence is left open
+            logs_details_md=_clip(logs_details_md, _BODY_BUDGETS["details"], sep="<details>"),
+        )
+
+        labels = failure_cfg.get("issue_labels", ["ci-failure", "triage"]) or []
+        dedupe = (labels[0] if labels else None)
 
-    # Create or update issue
-    res = await gh.create_issue(title=title, body=body, labels=labels, dedupe_label=dedupe)
-    if not res.get("success"):
-        logger.error(f"Failed to create triage issue: {res}")
-    else:
-        logger.info(f"Triage issue ready: #{res.get('issue_number')}")
+        # Create or update issue
+        res = await gh.create_issue(title=title, body=body, labels=labels, dedupe_label=dedupe)
+        if not res.get("success"):
+            logger.error(f"Failed to create triage issue: {res}")
+        else:
+            logger.info(f"Triage issue ready: #{res.get('issue_number')}")
 
 
 def parse_args() -> argparse.Namespace:
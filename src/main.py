@@ -7,36 +7,73 @@ but is designed to be enhanced by agents over time.
 """
 
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
+import os
+import secrets
+import time
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
 
+import orjson
 import uvicorn
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _orjson_default(obj: Any) -> Any:
+    """Encode the types orjson has no native support for (Pydantic models)."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _dumps(content: Any) -> bytes:
+    """Serialize content as JSON, writing UTC datetimes with a Z suffix."""
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z, default=_orjson_default)
+
+class FastORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also encodes Pydantic models, via _dumps."""
+    
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Seed Application",
     description="A self-evolving application powered by AI agents",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastORJSONResponse
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify actual origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def _parse_origins(value: str) -> List[str]:
+    """Split a comma-separated origin list, dropping blanks."""
+    return [origin.strip() for origin in value.split(",") if origin.strip()]
+
+# Add CORS middleware for the comma-separated CORS_ORIGINS ("*" by default).
+# Set CORS_ORIGINS to an empty string to skip the middleware when the API is
+# not called from browsers.
+CORS_ORIGINS = _parse_origins(os.getenv("CORS_ORIGINS", "*"))
+if CORS_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=CORS_ORIGINS,
+        # With credentials on, Starlette answers "*" by echoing the caller's
+        # Origin, which would let any site make credentialed requests
+        allow_credentials="*" not in CORS_ORIGINS,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+# Compress larger bodies such as /evolution-log; small ones aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
 
 # Pydantic models for request/response
 class HealthResponse(BaseModel):
@@ -51,7 +88,7 @@ class InfoResponse(BaseModel):
     description: str
     version: str
     features: List[str]
-    last_evolution: Optional[str] = None
+    last_evolution: Optional[datetime] = None
 
 class EvolutionLogEntry(BaseModel):
     """Evolution log entry model."""
@@ -62,70 +99,107 @@ class EvolutionLogEntry(BaseModel):
     status: str
 
 # In-memory storage (would be replaced by database in evolution)
-evolution_log: List[EvolutionLogEntry] = []
+# Only the most recent entries are kept; the oldest are evicted once full
+EVOLUTION_LOG_LIMIT = 1000
+evolution_log: Deque[EvolutionLogEntry] = deque(maxlen=EVOLUTION_LOG_LIMIT)
+_last_evolution: Optional[datetime] = None  # timestamp of the newest entry, set on write
 app_features: List[str] = ["Health Check", "API Documentation", "Evolution Tracking"]
+_app_features_set: Set[str] = set(app_features)  # O(1) membership; the list keeps order
+
+# Encoded bodies of the read-mostly GET endpoints, keyed by path. Mutating
+# endpoints call _invalidate_responses(), which also moves the ETag on.
+_response_bodies: Dict[str, bytes] = {}
+_state_version = 0
+_etag_prefix = secrets.token_hex(4)  # keeps ETags from one process apart from the next
+
+def _invalidate_responses() -> None:
+    """Drop cached bodies after evolution_log or app_features changes."""
+    global _state_version
+    _state_version += 1
+    _response_bodies.clear()
+
+def _cached_json(request: Request, build: Callable[[], Any]) -> Response:
+    """Serve request from the body cache, or 304 if the client's copy is current."""
+    etag = f'W/"{_etag_prefix}-{_state_version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    body = _response_bodies.get(request.url.path)
+    if body is None:
+        body = _response_bodies[request.url.path] = _dumps(build())
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+# Handlers return their Response directly, so FastAPI never runs
+# jsonable_encoder or response validation on them; `responses` only
+# documents each schema in OpenAPI.
 
-@app.get("/", response_model=Dict[str, str])
-async def root() -> Dict[str, str]:
+# The welcome payload never changes, so it is encoded once at import
+_ROOT_BODY = _dumps({
+    "message": "Welcome to the AI Seed Application!",
+    "description": "This application evolves through AI agent contributions",
+    "docs": "/docs",
+    "health": "/health"
+})
+
+@app.get("/", responses={200: {"model": Dict[str, str]}})
+async def root() -> Response:
     """
     Root endpoint that returns a welcome message.
     
     Returns:
-        Dict[str, str]: Welcome message and basic information
+        Response: Welcome message and basic information
     """
-    return {
-        "message": "Welcome to the AI Seed Application!",
-        "description": "This application evolves through AI agent contributions",
-        "docs": "/docs",
-        "health": "/health"
-    }
+    return Response(_ROOT_BODY, media_type="application/json")
 
-@app.get("/health", response_model=HealthResponse)
-async def health_check() -> HealthResponse:
+@app.get("/health", responses={200: {"model": HealthResponse}})
+async def health_check() -> FastORJSONResponse:
     """
     Health check endpoint for monitoring and deployment verification.
     
     Returns:
-        HealthResponse: Current health status and metadata
+        FastORJSONResponse: Current health status and metadata (HealthResponse schema)
     """
-    return HealthResponse(
-        status="healthy",
-        timestamp=datetime.now(),
-        version="1.0.0"
-    )
+    return FastORJSONResponse({
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc),
+        "version": "1.0.0"
+    })
 
-@app.get("/info", response_model=InfoResponse)
-async def get_info() -> InfoResponse:
+@app.get("/info", responses={200: {"model": InfoResponse}})
+async def get_info(request: Request) -> Response:
     """
     Get application information including current features and evolution status.
     
     Returns:
-        InfoResponse: Application metadata and feature list
-    """
-    last_evolution = None
-    if evolution_log:
-        last_evolution = evolution_log[-1].timestamp.isoformat()
-    
-    return InfoResponse(
-        name="AI Seed Application",
-        description="A self-evolving application powered by AI agents",
-        version="1.0.0",
-        features=app_features,
-        last_evolution=last_evolution
-    )
+        Response: Application metadata and feature list (InfoResponse schema)
+    """
+    return _cached_json(request, lambda: {
+        "name": "AI Seed Application",
+        "description": "A self-evolving application powered by AI agents",
+        "version": "1.0.0",
+        "features": app_features,
+        "last_evolution": _last_evolution
+    })
 
-@app.get("/evolution-log", response_model=List[EvolutionLogEntry])
-async def get_evolution_log() -> List[EvolutionLogEntry]:
+@app.get("/evolution-log", responses={200: {"model": List[EvolutionLogEntry]}})
+async def get_evolution_log(
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0)
+) -> FastORJSONResponse:
     """
-    Get the log of all evolution events processed by AI agents.
+    Get the log of evolution events processed by AI agents, oldest first.
     
+    Args:
+        limit: Maximum number of entries to return (all when omitted)
+        offset: Number of entries to skip
+        
     Returns:
-        List[EvolutionLogEntry]: History of evolution events
+        FastORJSONResponse: History of evolution events (EvolutionLogEntry list)
     """
-    return evolution_log
+    stop = None if limit is None else offset + limit
+    return FastORJSONResponse(list(islice(evolution_log, offset, stop)))
 
-@app.post("/evolution-log", response_model=Dict[str, str])
-async def add_evolution_entry(entry: EvolutionLogEntry) -> Dict[str, str]:
+@app.post("/evolution-log", responses={200: {"model": Dict[str, str]}})
+async def add_evolution_entry(entry: EvolutionLogEntry) -> FastORJSONResponse:
     """
     Add a new evolution entry to the log (typically called by AI agents).
     
@@ -133,28 +207,31 @@ async def add_evolution_entry(entry: EvolutionLogEntry) -> Dict[str, str]:
         entry: Evolution log entry to add
         
     Returns:
-        Dict[str, str]: Confirmation message
+        FastORJSONResponse: Confirmation message
     """
+    global _last_evolution
     evolution_log.append(entry)
-    logger.info(f"Added evolution entry for issue #{entry.issue_number}")
+    _last_evolution = entry.timestamp
+    _invalidate_responses()
+    logger.info("Added evolution entry for issue #%d", entry.issue_number)
     
-    return {
+    return FastORJSONResponse({
         "message": "Evolution entry added successfully",
         "issue_number": str(entry.issue_number)
-    }
+    })
 
-@app.get("/features", response_model=List[str])
-async def get_features() -> List[str]:
+@app.get("/features", responses={200: {"model": List[str]}})
+async def get_features(request: Request) -> Response:
     """
     Get the current list of application features.
     
     Returns:
-        List[str]: List of current features
+        Response: List of current features
     """
-    return app_features
+    return _cached_json(request, lambda: app_features)
 
-@app.post("/features", response_model=Dict[str, str])
-async def add_feature(feature: Dict[str, str]) -> Dict[str, str]:
+@app.post("/features", responses={200: {"model": Dict[str, str]}})
+async def add_feature(feature: Dict[str, str]) -> FastORJSONResponse:
     """
     Add a new feature to the application (typically called by AI agents).
     
@@ -162,7 +239,7 @@ async def add_feature(feature: Dict[str, str]) -> Dict[str, str]:
         feature: Feature information with 'name' key
         
     Returns:
-        Dict[str, str]: Confirmation message
+        FastORJSONResponse: Confirmation message
     """
     feature_name = feature.get("name")
     if not feature_name:
@@ -171,22 +248,29 @@ async def add_feature(feature: Dict[str, str]) -> Dict[str, str]:
             detail="Feature name is required"
         )
     
-    if feature_name not in app_features:
+    message = "Feature already exists"
+    if feature_name not in _app_features_set:
         app_features.append(feature_name)
-        logger.info(f"Added new feature: {feature_name}")
-        
-        return {
-            "message": "Feature added successfully",
-            "feature": feature_name
-        }
-    else:
-        return {
-            "message": "Feature already exists",
-            "feature": feature_name
-        }
+        _app_features_set.add(feature_name)
+        _invalidate_responses()
+        logger.info("Added new feature: %s", feature_name)
+        message = "Feature added successfully"
+    
+    return FastORJSONResponse({"message": message, "feature": feature_name})
+
+# (epoch second, ISO string) of the last error timestamp formatted
+_cached_iso_ts: Tuple[int, str] = (0, "")
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO string at second granularity, formatted once per second."""
+    global _cached_iso_ts
+    second = int(time.time())
+    if second != _cached_iso_ts[0]:
+        _cached_iso_ts = (second, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(second)))
+    return _cached_iso_ts[1]
 
 @app.exception_handler(HTTPException)
-async def http_exception_handler(request, exc: HTTPException) -> JSONResponse:
+async def http_exception_handler(request, exc: HTTPException) -> FastORJSONResponse:
     """
     Global HTTP exception handler.
     
@@ -195,19 +279,19 @@ async def http_exception_handler(request, exc: HTTPException) -> JSONResponse:
         exc: The HTTP exception
         
     Returns:
-        JSONResponse: Formatted error response
+        FastORJSONResponse: Formatted error response
     """
-    return JSONResponse(
+    return FastORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.detail,
             "status_code": exc.status_code,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }
     )
 
 @app.exception_handler(Exception)
-async def general_exception_handler(request, exc: Exception) -> JSONResponse:
+async def general_exception_handler(request, exc: Exception) -> FastORJSONResponse:
     """
     Global exception handler for unhandled exceptions.
     
@@ -216,16 +300,16 @@ async def general_exception_handler(request, exc: Exception) -> JSONResponse:
         exc: The exception
         
     Returns:
-        JSONResponse: Formatted error response
+        FastORJSONResponse: Formatted error response
     """
-    logger.error(f"Unhandled exception: {exc}")
+    logger.error("Unhandled exception: %s", exc)
     
-    return JSONResponse(
+    return FastORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": "Internal server error",
             "status_code": 500,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }
     )
 
@@ -238,12 +322,17 @@ def main() -> None:
     """
     logger.info("Starting AI Seed Application...")
     
+    # Auto-reload watches the source tree and costs throughput, so only
+    # development runs get it. Worker count comes from WEB_CONCURRENCY;
+    # the in-memory stores above are per process, so the default stays 1.
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
+        host=os.getenv("APP_HOST", "0.0.0.0"),
+        port=int(os.getenv("APP_PORT", "8000")),
+        reload=os.getenv("APP_ENV") == "development",
+        loop="uvloop",
+        http="httptools",
+        log_level=os.getenv("LOG_LEVEL", "info").lower()
     )
 
 if __name__ == "__main__":
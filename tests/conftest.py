@@ -6,29 +6,50 @@ for all tests in the AI seed repository.
 """
 
 import asyncio
-import shutil
 import tempfile
 from pathlib import Path
-from typing import Any, Dict, Generator
+from typing import Any, Dict, Generator, Tuple
 from unittest.mock import MagicMock
 
 import pytest
+import yaml
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+WORKFLOWS_DIR = REPO_ROOT / ".github" / "workflows"
+# Globbed once at import; workflow files don't change during a session
+WORKFLOW_FILES: Tuple[Path, ...] = tuple(sorted(WORKFLOWS_DIR.glob("*.yml")))
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Run async tests on uvloop when it is installed (it ships with uvicorn[standard])."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
 
 
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create an event loop for async tests."""
-    loop = asyncio.get_event_loop()
-    yield loop
-    loop.close()
+def _temp_root() -> Generator[Path, None, None]:
+    """Session-wide parent for test temp directories, removed once at the end."""
+    with tempfile.TemporaryDirectory() as root:
+        yield Path(root)
 
 
 @pytest.fixture
-def temp_directory() -> Generator[Path, None, None]:
-    """Create a temporary directory for tests."""
-    temp_dir = Path(tempfile.mkdtemp())
-    yield temp_dir
-    shutil.rmtree(temp_dir)
+def temp_directory(_temp_root: Path) -> Path:
+    """Create a temporary directory for tests.
+    
+    Each test gets a fresh subdirectory; cleanup is deferred to the session
+    teardown of _temp_root instead of a tree removal per test.
+    """
+    return Path(tempfile.mkdtemp(dir=_temp_root))
 
 
 @pytest.fixture
@@ -86,6 +107,18 @@ def sample_repository_structure():
     }
 
 
+@pytest.fixture(scope="session")
+def workflow_sources() -> Dict[str, str]:
+    """Raw text of every GitHub workflow file, keyed by file name (read once per session)."""
+    return {path.name: path.read_bytes().decode() for path in WORKFLOW_FILES}
+
+
+@pytest.fixture(scope="session")
+def workflows(workflow_sources: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """Parsed workflow documents keyed by file name (shared per session; don't mutate)."""
+    return {name: yaml.load(source, Loader=_SafeLoader) for name, source in workflow_sources.items()}
+
+
 # Test markers for categorizing tests
 def pytest_configure(config):
     """Configure custom pytest markers."""
@@ -100,12 +133,23 @@ class AsyncTestHelper:
     """Helper class for async test operations."""
     
     @staticmethod
-    async def wait_for_condition(condition_func, timeout=5.0, interval=0.1):
-        """Wait for a condition to become true."""
-        import time
-        start_time = time.time()
+    async def wait_for_condition(condition_func=None, timeout=5.0, interval=0.01, event=None):
+        """Wait for a condition to become true.
+        
+        Pass an asyncio.Event to be woken as soon as it is set instead of
+        polling condition_func every `interval` seconds.
+        """
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+                
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
         
-        while time.time() - start_time < timeout:
+        while loop.time() < deadline:
             if condition_func():
                 return True
             await asyncio.sleep(interval)
@@ -113,6 +157,17 @@ class AsyncTestHelper:
         return False
 
 
+def configure_mock_results(mock: MagicMock, **results: Any) -> None:
+    """Set what several mocked methods return in one configure_mock() call.
+    
+    Exception instances are installed as side effects (raised) instead.
+    """
+    mock.configure_mock(**{
+        f"{name}.{'side_effect' if isinstance(result, BaseException) else 'return_value'}": result
+        for name, result in results.items()
+    })
+
+
 @pytest.fixture
 def async_helper():
     """Provide async test helper."""
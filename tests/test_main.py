@@ -5,26 +5,49 @@ This module tests all endpoints, error handling, and core functionality
 of the evolvable application core.
 """
 
-from datetime import datetime
+import asyncio
+from datetime import datetime, timezone
+from typing import Any
 
+import httpx
+import orjson
 import pytest
 from fastapi.testclient import TestClient
 
 # Import the app
+import src.main as main_module
 from src.main import app, app_features, evolution_log
 
+DEFAULT_FEATURES = list(app_features)
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+    """Create one test client for the FastAPI app, shared by the session."""
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(autouse=True)
+def _reset_state():
+    """Restore the app's in-memory stores before each test."""
+    evolution_log.clear()
+    app_features[:] = DEFAULT_FEATURES
+    main_module._app_features_set = set(DEFAULT_FEATURES)
+    main_module._last_evolution = None
+    main_module._invalidate_responses()
 
 
-@pytest.fixture
+def _post_json(client: TestClient, path: str, obj: Any) -> httpx.Response:
+    """POST obj as a JSON body encoded with orjson, like the app's own responses."""
+    return client.post(path, content=orjson.dumps(obj), headers={"Content-Type": "application/json"})
+
+
+@pytest.fixture(scope="session")
 def sample_evolution_entry():
-    """Create a sample evolution log entry for testing."""
+    """Create a sample evolution log entry for testing (shared per session; don't mutate)."""
     return {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": "2024-01-01T12:00:00",
         "issue_number": 123,
         "description": "Test evolution entry",
         "agent_summary": "Agents successfully implemented test feature",
@@ -63,6 +86,7 @@ class TestHealthCheck:
         # Validate timestamp format
         timestamp = datetime.fromisoformat(data["timestamp"].replace('Z', '+00:00'))
         assert isinstance(timestamp, datetime)
+        assert timestamp.utcoffset().total_seconds() == 0  # reported in UTC
 
 
 class TestApplicationInfo:
@@ -82,33 +106,36 @@ class TestApplicationInfo:
     def test_info_with_evolution_history(self, client, sample_evolution_entry):
         """Test info endpoint when evolution history exists."""
         # Add an evolution entry
-        client.post("/evolution-log", json=sample_evolution_entry)
+        _post_json(client, "/evolution-log", sample_evolution_entry)
         
         response = client.get("/info")
         assert response.status_code == 200
         
         data = response.json()
         assert data["last_evolution"] is not None
+    
+    def test_info_last_evolution_matches_log_format(self, client, sample_evolution_entry):
+        """Test that /info and /evolution-log write UTC timestamps the same way."""
+        _post_json(client, "/evolution-log", {**sample_evolution_entry, "timestamp": "2024-01-01T12:00:00+00:00"})
+        
+        last_evolution = client.get("/info").json()["last_evolution"]
+        
+        assert last_evolution == "2024-01-01T12:00:00Z"
+        assert client.get("/evolution-log").json()[-1]["timestamp"] == last_evolution
 
 
 class TestEvolutionLog:
     """Test evolution log functionality."""
     
-    def setUp(self):
-        """Clear evolution log before each test."""
-        evolution_log.clear()
-    
     def test_get_empty_evolution_log(self, client):
         """Test getting evolution log when empty."""
-        evolution_log.clear()
         response = client.get("/evolution-log")
         assert response.status_code == 200
         assert response.json() == []
     
     def test_add_evolution_entry(self, client, sample_evolution_entry):
         """Test adding a new evolution entry."""
-        evolution_log.clear()
-        response = client.post("/evolution-log", json=sample_evolution_entry)
+        response = _post_json(client, "/evolution-log", sample_evolution_entry)
         assert response.status_code == 200
         
         data = response.json()
@@ -123,8 +150,6 @@ class TestEvolutionLog:
     
     def test_add_multiple_evolution_entries(self, client):
         """Test adding multiple evolution entries."""
-        evolution_log.clear()
-        
         entries = [
             {
                 "timestamp": datetime.now().isoformat(),
@@ -137,23 +162,58 @@ class TestEvolutionLog:
         ]
         
         for entry in entries:
-            response = client.post("/evolution-log", json=entry)
+            response = _post_json(client, "/evolution-log", entry)
             assert response.status_code == 200
         
         # Verify all entries were added
         get_response = client.get("/evolution-log")
         retrieved_entries = get_response.json()
         assert len(retrieved_entries) == 3
+    
+    def test_evolution_log_pagination(self, client):
+        """Test paging through the evolution log with limit and offset."""
+        for i in range(1, 6):
+            _post_json(client, "/evolution-log", {
+                "timestamp": datetime.now().isoformat(),
+                "issue_number": i,
+                "description": f"Test evolution {i}",
+                "agent_summary": f"Summary {i}",
+                "status": "completed"
+            })
+        
+        page = client.get("/evolution-log", params={"limit": 2, "offset": 1}).json()
+        assert [e["issue_number"] for e in page] == [2, 3]
+        assert len(client.get("/evolution-log", params={"offset": 3}).json()) == 2
+        assert client.get("/evolution-log", params={"limit": 0}).status_code == 422
+    
+    def test_large_responses_are_gzipped(self, client):
+        """Test that large JSON bodies are compressed and small ones are not."""
+        for i in range(20):
+            _post_json(client, "/evolution-log", {
+                "timestamp": datetime.now().isoformat(),
+                "issue_number": i,
+                "description": "Repeated description " * 5,
+                "agent_summary": "Summary",
+                "status": "completed"
+            })
+        
+        response = client.get("/evolution-log", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 20
+        
+        small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+    
+    def test_evolution_log_is_bounded(self):
+        """Test that the log evicts its oldest entries past the limit."""
+        from src.main import EVOLUTION_LOG_LIMIT
+        
+        assert evolution_log.maxlen == EVOLUTION_LOG_LIMIT
 
 
 class TestFeatureManagement:
     """Test feature management endpoints."""
     
-    def setUp(self):
-        """Reset features before each test."""
-        app_features.clear()
-        app_features.extend(["Health Check", "API Documentation", "Evolution Tracking"])
-    
     def test_get_features(self, client):
         """Test getting current features list."""
         response = client.get("/features")
@@ -179,6 +239,23 @@ class TestFeatureManagement:
         features = get_response.json()
         assert "Test Feature" in features
     
+    def test_features_etag_revalidation(self, client):
+        """Test that cached GET bodies answer If-None-Match and change after a write."""
+        first = client.get("/features")
+        etag = first.headers["etag"]
+        
+        cached = client.get("/features", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        
+        client.post("/features", json={"name": "ETag Feature"})
+        
+        refreshed = client.get("/features", headers={"If-None-Match": etag})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["etag"] != etag
+        assert "ETag Feature" in refreshed.json()
+        assert "ETag Feature" in client.get("/info").json()["features"]
+    
     def test_add_duplicate_feature(self, client):
         """Test adding a feature that already exists."""
         existing_feature = {"name": "Health Check"}
@@ -196,6 +273,11 @@ class TestFeatureManagement:
         
         data = response.json()
         assert "Feature name is required" in data["error"]
+        
+        # Error timestamps are ISO 8601 UTC strings at second granularity
+        timestamp = datetime.fromisoformat(data["timestamp"])
+        assert timestamp.utcoffset().total_seconds() == 0
+        assert timestamp.microsecond == 0
 
 
 class TestErrorHandling:
@@ -230,11 +312,57 @@ class TestApplicationStartup:
         assert app.version == "1.0.0"
         assert "self-evolving" in app.description.lower()
     
+    def test_default_response_class(self, client):
+        """Test that endpoints are served with the orjson-backed response class."""
+        from src.main import EvolutionLogEntry, FastORJSONResponse
+        
+        default = app.router.default_response_class
+        assert getattr(default, "value", default) is FastORJSONResponse  # may be a DefaultPlaceholder
+        assert client.get("/health").headers["content-type"] == "application/json"
+        
+        # Pydantic models encode directly and UTC datetimes use the Z suffix
+        entry = EvolutionLogEntry(
+            timestamp=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            issue_number=1,
+            description="d",
+            agent_summary="s",
+            status="completed"
+        )
+        body = FastORJSONResponse([entry]).body
+        assert b'"timestamp":"2024-01-02T03:04:05Z"' in body
+    
+    def test_main_server_settings(self):
+        """Test that main() runs uvicorn on uvloop/httptools and reloads only in development."""
+        from unittest.mock import patch
+        
+        from src.main import main
+        
+        with patch("src.main.uvicorn.run") as run, patch.dict("os.environ", {"APP_PORT": "9000"}):
+            main()
+        kwargs = run.call_args.kwargs
+        assert (kwargs["loop"], kwargs["http"], kwargs["port"]) == ("uvloop", "httptools", 9000)
+        assert kwargs["reload"] is False
+        
+        with patch("src.main.uvicorn.run") as run, patch.dict("os.environ", {"APP_ENV": "development"}):
+            main()
+        assert run.call_args.kwargs["reload"] is True
+    
     def test_cors_middleware(self):
         """Test CORS middleware is configured."""
         # Check that CORS middleware is present
         middleware_classes = [middleware.cls.__name__ for middleware in app.user_middleware]
         assert "CORSMiddleware" in middleware_classes
+    
+    def test_cors_origins_from_environment(self):
+        """Test CORS_ORIGINS parsing and the wildcard default."""
+        from src.main import CORS_ORIGINS, _parse_origins
+        
+        assert _parse_origins("https://a.example, https://b.example,") == ["https://a.example", "https://b.example"]
+        assert _parse_origins("") == []  # empty value skips the middleware
+        
+        cors = next(m for m in app.user_middleware if m.cls.__name__ == "CORSMiddleware")
+        assert CORS_ORIGINS == ["*"]
+        assert cors.kwargs["allow_credentials"] is False
 
 
 # Integration tests
@@ -248,7 +376,7 @@ class TestIntegration:
         initial_log = client.get("/evolution-log").json()
         
         # 2. Add evolution entry
-        evolution_response = client.post("/evolution-log", json=sample_evolution_entry)
+        evolution_response = _post_json(client, "/evolution-log", sample_evolution_entry)
         assert evolution_response.status_code == 200
         
         # 3. Add new feature (simulating agent adding feature)
@@ -279,26 +407,26 @@ class TestPerformance:
         import time
         
         endpoints = ["/", "/health", "/info", "/features", "/evolution-log"]
+        durations = []
         
+        # perf_counter_ns is monotonic, so wall-clock adjustments can't skew it
         for endpoint in endpoints:
-            start_time = time.time()
+            start = time.perf_counter_ns()
             response = client.get(endpoint)
-            end_time = time.time()
+            durations.append(time.perf_counter_ns() - start)
             
             assert response.status_code == 200
-            assert (end_time - start_time) < 1.0  # Less than 1 second
+        
+        assert max(durations) < 1_000_000_000  # Less than 1 second each
     
-    def test_concurrent_requests(self, client):
+    @pytest.mark.asyncio
+    async def test_concurrent_requests(self):
         """Test handling of concurrent requests."""
-        import concurrent.futures
-        
-        def make_request():
-            return client.get("/health")
-        
-        # Test 10 concurrent requests
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(make_request) for _ in range(10)]
-            responses = [future.result() for future in futures]
+        # Drive the app in-process on this test's event loop
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            # Test 10 concurrent requests
+            responses = await asyncio.gather(*[ac.get("/health") for _ in range(10)])
         
         # All requests should succeed
         for response in responses:
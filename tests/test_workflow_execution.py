@@ -5,116 +5,110 @@ This module tests the actual execution logic of workflows without
 requiring the full GitHub Actions environment.
 """
 
+import argparse
 import asyncio
-import tempfile
-import yaml
-from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, patch
+import re
+from unittest.mock import AsyncMock, patch
 
+import orjson
 import pytest
 
+from tests.conftest import REPO_ROOT, WORKFLOW_FILES
+
+DOCKERFILE = REPO_ROOT / "Dockerfile"
+
+# Instruction keyword at the start of each Dockerfile line
+_DOCKER_INSTRUCTION_RE = re.compile(r'^\s*([A-Z]+)\b', re.MULTILINE)
+
+# A properly formatted ${{ secrets.NAME }} reference
+_SECRET_RE = re.compile(r'\$\{\{\s*secrets\.\w+\s*\}\}')
+
 
 class TestWorkflowExecution:
     """Test workflow execution simulation and validation."""
 
     def test_ci_cd_workflow_execution_simulation(self):
         """Simulate CI/CD workflow execution logic."""
-        # Test that all required tools are available for CI/CD
-        import subprocess
-        import sys
+        # Test that all required tools are installed for CI/CD; finding the
+        # module is enough, without starting an interpreter per tool
+        from importlib.util import find_spec
         
-        # These tools should be available in the environment
         tools_to_check = ['flake8', 'black', 'isort', 'mypy', 'pytest']
         optional_tools = {'mypy'}
         
         for tool in tools_to_check:
-            try:
-                result = subprocess.run([sys.executable, '-m', tool, '--version'], 
-                                      capture_output=True, text=True, timeout=10)
-                if tool in optional_tools:
-                    if result.returncode != 0:
-                        pytest.skip(f"{tool} is optional and not available or not working in test environment")
-                else:
-                    assert result.returncode == 0, f"{tool} not available or not working"
-            except (subprocess.TimeoutExpired, FileNotFoundError):
+            if find_spec(tool) is None:
                 if tool in optional_tools:
                     pytest.skip(f"{tool} is optional and not available in test environment")
-                else:
-                    pytest.skip(f"{tool} not available in test environment")
+                pytest.fail(f"{tool} not available")
     
     def test_docker_workflow_simulation(self):
         """Simulate Docker workflow steps."""
-        dockerfile_path = Path(__file__).parent.parent / "Dockerfile"
-        assert dockerfile_path.exists(), "Dockerfile must exist for Docker workflow"
+        assert DOCKERFILE.exists(), "Dockerfile must exist for Docker workflow"
         
-        # Check Dockerfile content for basic requirements
-        with open(dockerfile_path, 'r') as f:
-            dockerfile_content = f.read()
+        # Check Dockerfile content for basic requirements in one pass
+        instructions = set(_DOCKER_INSTRUCTION_RE.findall(DOCKERFILE.read_bytes().decode()))
         
         required_instructions = ["FROM", "WORKDIR", "COPY", "RUN", "EXPOSE", "CMD"]
-        for instruction in required_instructions:
-            assert instruction in dockerfile_content, f"Missing {instruction} in Dockerfile"
+        missing = [i for i in required_instructions if i not in instructions]
+        assert not missing, f"Missing {', '.join(missing)} in Dockerfile"
     
     @pytest.mark.asyncio
-    async def test_triage_workflow_simulation(self):
+    @patch.dict('os.environ', {}, clear=True)  # no LLM keys, for fallback testing
+    @patch('scripts.triage_failure.Path')
+    @patch('builtins.open')
+    @patch('scripts.triage_failure.GitHubIntegration')
+    async def test_triage_workflow_simulation(self, mock_gh_class, mock_open, _mock_path, temp_directory):
         """Simulate triage workflow execution."""
         from scripts.triage_failure import main_async
-        from unittest.mock import MagicMock
         
-        # Create a temporary directory with sample logs
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            (temp_path / "failed_job.txt").write_text("ERROR: Test failed\nStack trace here")
-            
-            # Mock arguments
-            args = MagicMock()
-            args.workflow_name = "ci-cd-pipeline"
-            args.run_url = "https://github.com/test/repo/actions/runs/123"
-            args.git_ref = "refs/heads/main"
-            args.commit_sha = "abc123def"
-            args.logs_root = str(temp_path)
-            args.tail_lines = 50
-            
-            # Mock configuration and dependencies
-            mock_config = {
-                "workflow": {
-                    "failure_reporting": {
-                        "logs_tail_lines": 50,
-                        "issue_labels": ["ci-failure", "triage"]
-                    }
+        # Sample logs in a temporary directory
+        (temp_directory / "failed_job.txt").write_text("ERROR: Test failed\nStack trace here")
+        
+        # Script arguments, as parse_args() would build them
+        args = argparse.Namespace(
+            workflow_name="ci-cd-pipeline",
+            run_url="https://github.com/test/repo/actions/runs/123",
+            git_ref="refs/heads/main",
+            commit_sha="abc123def",
+            logs_root=str(temp_directory),
+            tail_lines=50
+        )
+        
+        # Mock configuration and dependencies
+        mock_config = {
+            "workflow": {
+                "failure_reporting": {
+                    "logs_tail_lines": 50,
+                    "issue_labels": ["ci-failure", "triage"]
                 }
             }
-            
-            # Mock environment (no LLM keys for fallback testing)
-            with patch.dict('os.environ', {}, clear=True):
-                with patch('scripts.triage_failure.Path'):
-                    with patch('builtins.open') as mock_open:
-                        with patch('scripts.triage_failure.GitHubIntegration') as mock_gh_class:
-                            # Setup mocks
-                            mock_open.return_value.__enter__.return_value.read.return_value = yaml.dump(mock_config)
-                            mock_gh = mock_gh_class.return_value
-                            mock_gh.get_repository_structure = AsyncMock(return_value={"tree": []})
-                            mock_gh.get_recent_commits = AsyncMock(return_value=[])
-                            mock_gh.create_issue = AsyncMock(return_value={"success": True, "issue_number": 456})
-                            
-                            # Execute the simulation
-                            try:
-                                await main_async(args)
-                                # Verify GitHub integration was called
-                                mock_gh.create_issue.assert_called_once()
-                            except Exception as e:
-                                pytest.fail(f"Triage workflow simulation failed: {e}")
-
+        }
+        
+        # JSON is valid YAML; the empty read ends the stream
+        mock_open.return_value.__enter__.return_value.read.side_effect = [
+            orjson.dumps(mock_config).decode(), ""
+        ]
+        mock_gh = mock_gh_class.return_value
+        mock_gh.get_repository_structure = AsyncMock(return_value={"tree": []})
+        mock_gh.get_recent_commits = AsyncMock(return_value=[])
+        mock_gh.create_issue = AsyncMock(return_value={"success": True, "issue_number": 456})
+        
+        # Execute the simulation
+        try:
+            await main_async(args)
+        except Exception as e:
+            pytest.fail(f"Triage workflow simulation failed: {e}")
+        
+        # Verify GitHub integration was called
+        mock_gh.create_issue.assert_called_once()
 
 class TestWorkflowValidation:
     """Test workflow configuration validation."""
 
-    def test_workflow_job_dependencies(self):
+    def test_workflow_job_dependencies(self, workflows):
         """Test that workflow jobs have correct dependencies."""
-        workflow_file = Path(__file__).parent.parent / ".github/workflows/ci-cd.yml"
-        
-        with open(workflow_file, 'r') as f:
-            workflow = yaml.safe_load(f)
+        workflow = workflows["ci-cd.yml"]
         
         jobs = workflow["jobs"]
         
@@ -128,12 +122,9 @@ class TestWorkflowValidation:
         assert "test" in deploy_needs
         assert "build-and-test-docker" in deploy_needs
     
-    def test_workflow_conditional_execution(self):
+    def test_workflow_conditional_execution(self, workflows):
         """Test that workflows have appropriate conditional execution."""
-        workflow_file = Path(__file__).parent.parent / ".github/workflows/ci-cd.yml"
-        
-        with open(workflow_file, 'r') as f:
-            workflow = yaml.safe_load(f)
+        workflow = workflows["ci-cd.yml"]
         
         # Deploy job should only run on main branch pushes
         deploy_job = workflow["jobs"]["deploy"]
@@ -142,12 +133,9 @@ class TestWorkflowValidation:
         assert "refs/heads/main" in deploy_condition
         assert "push" in deploy_condition
     
-    def test_triage_workflow_trigger_conditions(self):
+    def test_triage_workflow_trigger_conditions(self, workflows):
         """Test that triage workflow has correct trigger conditions."""
-        workflow_file = Path(__file__).parent.parent / ".github/workflows/triage-on-failure.yml"
-        
-        with open(workflow_file, 'r') as f:
-            workflow = yaml.safe_load(f)
+        workflow = workflows["triage-on-failure.yml"]
         
         # Handle YAML parsing quirk where 'on' becomes True
         on_key = "on" if "on" in workflow else True
@@ -166,56 +154,38 @@ class TestWorkflowValidation:
 class TestWorkflowSecurity:
     """Test workflow security configurations."""
 
-    def test_workflow_permissions_minimal(self):
+    @pytest.mark.parametrize("workflow_name", [
+        "ci-cd.yml",
+        "triage-on-failure.yml",
+        "evolve-on-issue.yml",
+        "docs-build-deploy.yml"
+    ])
+    def test_workflow_permissions_minimal(self, workflows, workflow_name):
         """Test that workflows use minimal required permissions."""
-        workflow_files = [
-            "ci-cd.yml",
-            "triage-on-failure.yml",
-            "evolve-on-issue.yml",
-            "docs-build-deploy.yml"
-        ]
-        
-        for workflow_name in workflow_files:
-            workflow_file = Path(__file__).parent.parent / ".github/workflows" / workflow_name
-            
-            with open(workflow_file, 'r') as f:
-                workflow = yaml.safe_load(f)
-            
-            if "permissions" in workflow:
-                permissions = workflow["permissions"]
-                
-                # Check that write permissions are only granted where necessary
-                for perm, level in permissions.items():
-                    if level == "write":
-                        # Only certain permissions should have write access
-                        allowed_write_perms = ["contents", "issues", "pages", "id-token"]
-                        assert perm in allowed_write_perms, f"Unexpected write permission: {perm} in {workflow_name}"
+        permissions = workflows[workflow_name].get("permissions", {})
+        
+        # Check that write permissions are only granted where necessary
+        for perm, level in permissions.items():
+            if level == "write":
+                # Only certain permissions should have write access
+                allowed_write_perms = ["contents", "issues", "pages", "id-token"]
+                assert perm in allowed_write_perms, f"Unexpected write permission: {perm} in {workflow_name}"
     
-    def test_workflow_secret_usage(self):
+    def test_workflow_secret_usage(self, workflow_sources):
         """Test that workflows properly use secrets."""
-        workflow_files = list(Path(__file__).parent.parent / ".github/workflows").glob("*.yml")
-        
-        for workflow_file in workflow_files:
-            with open(workflow_file, 'r') as f:
-                content = f.read()
-            
+        for workflow_name, content in workflow_sources.items():
             # If secrets are referenced, they should use proper syntax
             if "secrets." in content:
                 # Should use ${{ secrets.SECRET_NAME }} syntax
-                import re
-                secret_refs = re.findall(r'\$\{\{\s*secrets\.\w+\s*\}\}', content)
-                assert len(secret_refs) > 0, f"Improperly formatted secrets in {workflow_file}"
+                assert _SECRET_RE.search(content), f"Improperly formatted secrets in {workflow_name}"
 
 
 class TestWorkflowPerformance:
     """Test workflow performance optimizations."""
 
-    def test_workflow_caching_configured(self):
+    def test_workflow_caching_configured(self, workflow_sources):
         """Test that workflows use appropriate caching."""
-        workflow_file = Path(__file__).parent.parent / ".github/workflows/ci-cd.yml"
-        
-        with open(workflow_file, 'r') as f:
-            content = f.read()
+        content = workflow_sources["ci-cd.yml"]
         
         # Should use pip caching for Python dependencies
         assert "cache: 'pip'" in content
@@ -223,12 +193,9 @@ class TestWorkflowPerformance:
         # Should specify cache dependencies
         assert "cache-dependency-path" in content
     
-    def test_workflow_step_efficiency(self):
+    def test_workflow_step_efficiency(self, workflows):
         """Test that workflows are structured for efficiency."""
-        workflow_file = Path(__file__).parent.parent / ".github/workflows/ci-cd.yml"
-        
-        with open(workflow_file, 'r') as f:
-            workflow = yaml.safe_load(f)
+        workflow = workflows["ci-cd.yml"]
         
         test_job = workflow["jobs"]["test"]
         steps = test_job["steps"]
@@ -251,12 +218,9 @@ class TestWorkflowPerformance:
 class TestWorkflowErrorHandling:
     """Test workflow error handling and resilience."""
 
-    def test_workflow_failure_handling(self):
+    def test_workflow_failure_handling(self, workflows):
         """Test that workflows handle failures appropriately."""
-        workflow_file = Path(__file__).parent.parent / ".github/workflows/ci-cd.yml"
-        
-        with open(workflow_file, 'r') as f:
-            workflow = yaml.safe_load(f)
+        workflow = workflows["ci-cd.yml"]
         
         test_job = workflow["jobs"]["test"]
         
@@ -268,18 +232,14 @@ class TestWorkflowErrorHandling:
         failure_step = failure_steps[0]
         assert "triage" in failure_step.get("name", "").lower()
     
-    def test_workflow_timeout_protection(self):
+    @pytest.mark.parametrize("workflow_name", [path.name for path in WORKFLOW_FILES])
+    def test_workflow_timeout_protection(self, workflows, workflow_name):
         """Test that workflows have reasonable timeout settings."""
-        # This is more of a best practice check since timeouts might be implicit
-        workflow_files = list(Path(__file__).parent.parent / ".github/workflows").glob("*.yml")
-        
-        for workflow_file in workflow_files:
-            with open(workflow_file, 'r') as f:
-                workflow = yaml.safe_load(f)
-            
-            # Check for reasonable job timeout settings if specified
-            for job_name, job_config in workflow.get("jobs", {}).items():
-                if "timeout-minutes" in job_config:
-                    timeout = job_config["timeout-minutes"]
-                    assert timeout <= 360, f"Job {job_name} has excessive timeout: {timeout} minutes"
-                    assert timeout >= 5, f"Job {job_name} has too short timeout: {timeout} minutes"
\ No newline at end of file
+        # This is more of a best practice check since timeouts might be implicit;
+        # timeouts that are specified should be between 5 and 360 minutes
+        bad = {
+            job_name: job_config["timeout-minutes"]
+            for job_name, job_config in workflows[workflow_name].get("jobs", {}).items()
+            if not 5 <= job_config.get("timeout-minutes", 5) <= 360
+        }
+        assert not bad, f"Jobs with unreasonable timeouts (minutes): {bad}"
\ No newline at end of file
@@ -4,43 +4,89 @@ Comprehensive test suite for GitHub workflows and associated scripts.
 This module tests workflow files, triage functionality, and CI/CD pipeline components.
 """
 
+import argparse
 import asyncio
 import json
 import os
+import re
 import tempfile
 import yaml
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, mock_open, patch
+from typing import Any, Dict, Iterator
+from unittest.mock import AsyncMock, mock_open, patch
 
+import orjson
 import pytest
 
+from tests.conftest import REPO_ROOT, WORKFLOW_FILES
+
 # Workflow test data and constants
-WORKFLOW_DIR = Path(__file__).parent.parent / ".github" / "workflows"
-SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+DOCKERFILE = REPO_ROOT / "Dockerfile"
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+
+# Sensitive word, optional whitespace, colon or =, optional whitespace, value,
+# outside comments; matched line by line in one sweep over a whole file
+_SECRET_ASSIGNMENT_RE = re.compile(
+    r"^[^#\n]*\b(password|secret|token|key)\b[ \t]*[:=][ \t]*([^\s#]+)",
+    re.IGNORECASE | re.MULTILINE
+)
+# Lines that reference variables or secrets, or grant permissions
+_SECRET_EXCLUDED = (
+    "${{", "secrets.", "GITHUB_TOKEN", "github.token", "github_token=",
+    "OPENAI_API_KEY", "ANTHROPIC_API_KEY", "id-token:", "token:",
+    "contents:", "issues:", "actions:", "pages:"
+)
+
+
+def _load_workflow(path: Path) -> Dict[str, Any]:
+    """Parse a workflow file from disk with libyaml when available.
+    
+    Only the syntax test parses files itself; the rest share the session
+    `workflows` fixture from conftest.
+    """
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=_SafeLoader)
+
+
+def _iter_strings(node: Any) -> Iterator[str]:
+    """Yield every string key and value in a parsed YAML document."""
+    if isinstance(node, str):
+        yield node
+    elif isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(key, str):
+                yield key
+            yield from _iter_strings(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _iter_strings(item)
 
 
 class TestWorkflowSyntax:
     """Test GitHub workflow YAML syntax and structure."""
     
-    def test_all_workflows_valid_yaml(self):
-        """Test that all workflow files have valid YAML syntax."""
-        workflow_files = list(WORKFLOW_DIR.glob("*.yml"))
-        assert len(workflow_files) > 0, "No workflow files found"
-        
-        for workflow_file in workflow_files:
-            with open(workflow_file, 'r') as f:
-                try:
-                    yaml.safe_load(f)
-                except yaml.YAMLError as e:
-                    pytest.fail(f"Invalid YAML syntax in {workflow_file}: {e}")
+    def test_workflow_files_present(self):
+        """Test that the repository defines workflow files."""
+        assert WORKFLOW_FILES, "No workflow files found"
     
-    def test_ci_cd_workflow_structure(self):
+    @pytest.mark.parametrize("workflow_file", WORKFLOW_FILES, ids=lambda p: p.name)
+    def test_workflow_valid_yaml(self, workflow_file):
+        """Test that each workflow file has valid YAML syntax."""
+        try:
+            _load_workflow(workflow_file)
+        except yaml.YAMLError as e:
+            pytest.fail(f"Invalid YAML syntax in {workflow_file}: {e}")
+    
+    def test_ci_cd_workflow_structure(self, workflows):
         """Test that ci-cd workflow has required structure."""
-        ci_cd_file = WORKFLOW_DIR / "ci-cd.yml"
-        assert ci_cd_file.exists(), "ci-cd.yml workflow file not found"
-        
-        with open(ci_cd_file, 'r') as f:
-            workflow = yaml.safe_load(f)
+        assert "ci-cd.yml" in workflows, "ci-cd.yml workflow file not found"
+        workflow = workflows["ci-cd.yml"]
         
         # Test basic structure
         assert "name" in workflow
@@ -50,15 +96,13 @@ class TestWorkflowSyntax:
         assert "jobs" in workflow
         
         # Test trigger conditions
-        on_config = workflow[on_key]
-        assert "push" in on_config
-        assert "pull_request" in on_config
+        missing_triggers = {"push", "pull_request"} - workflow[on_key].keys()
+        assert not missing_triggers, f"Missing triggers: {sorted(missing_triggers)}"
         
         # Test required jobs
         jobs = workflow["jobs"]
-        assert "test" in jobs, "Missing test job"
-        assert "build-and-test-docker" in jobs, "Missing Docker build job"
-        assert "deploy" in jobs, "Missing deploy job"
+        missing_jobs = {"test", "build-and-test-docker", "deploy"} - jobs.keys()
+        assert not missing_jobs, f"Missing jobs: {sorted(missing_jobs)}"
         
         # Test test job structure
         test_job = jobs["test"]
@@ -66,19 +110,17 @@ class TestWorkflowSyntax:
         assert "steps" in test_job
         assert test_job["runs-on"] == "ubuntu-latest"
         
-        # Test that test job includes key steps
-        steps = [step.get("name", "") for step in test_job["steps"]]
+        # Test that test job includes key steps; one newline-joined string of
+        # step names answers every "some step name contains X" check
+        step_names = "\n".join(step.get("name", "") for step in test_job["steps"])
         expected_steps = ["Set up Python", "Install dependencies", "Test with pytest"]
-        for expected_step in expected_steps:
-            assert any(expected_step in step for step in steps), f"Missing step: {expected_step}"
+        missing_steps = [step for step in expected_steps if step not in step_names]
+        assert not missing_steps, f"Missing steps: {missing_steps}"
     
-    def test_triage_workflow_structure(self):
+    def test_triage_workflow_structure(self, workflows):
         """Test that triage-on-failure workflow has required structure."""
-        triage_file = WORKFLOW_DIR / "triage-on-failure.yml"
-        assert triage_file.exists(), "triage-on-failure.yml workflow file not found"
-        
-        with open(triage_file, 'r') as f:
-            workflow = yaml.safe_load(f)
+        assert "triage-on-failure.yml" in workflows, "triage-on-failure.yml workflow file not found"
+        workflow = workflows["triage-on-failure.yml"]
         
         # Test trigger structure
         on_key = "on" if "on" in workflow else True
@@ -112,9 +154,9 @@ class TestTriageFailureScript:
             
             yield temp_path
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def mock_config(self):
-        """Mock configuration for testing."""
+        """Mock configuration for testing (shared per session; don't mutate)."""
         return {
             "workflow": {
                 "failure_reporting": {
@@ -128,11 +170,17 @@ class TestTriageFailureScript:
             }
         }
     
-    def test_collect_logs_excerpt(self, temp_logs_dir):
+    @pytest.fixture(scope="session")
+    def mock_config_yaml(self, mock_config):
+        """mock_config serialized once as a config file body; JSON is valid YAML."""
+        return orjson.dumps(mock_config).decode()
+    
+    @pytest.mark.asyncio
+    async def test_scan_logs(self, temp_logs_dir):
         """Test log collection and excerpt generation."""
-        from scripts.triage_failure import collect_logs_excerpt
+        from scripts.triage_failure import scan_logs
         
-        jobs_summary, excerpt = collect_logs_excerpt(temp_logs_dir, tail=2)
+        jobs_summary, excerpt, details_md = await scan_logs(temp_logs_dir, tail=2)
         
         # Test jobs summary
         assert "job1.txt" in jobs_summary
@@ -146,16 +194,84 @@ class TestTriageFailureScript:
         
         # Test that tailing works (should only get last 2 lines per file)
         assert excerpt.count('\n') >= 6  # At least some content from each file
+        
+        # Test details - one collapsible block per file from the same read
+        assert details_md.count("<details>") == 3
+        assert "```text\nStack trace here\nMore context\n```" in details_md
+    
+    @pytest.mark.asyncio
+    async def test_scan_logs_caps_details_blocks(self, temp_logs_dir):
+        """Test that details are capped at max_files while the excerpt covers every file."""
+        from scripts.triage_failure import scan_logs
+        
+        (temp_logs_dir / "job4.txt").write_text("has ``` fence")
+        
+        jobs_summary, excerpt, details_md = await scan_logs(temp_logs_dir, tail=2, max_files=2)
+        
+        assert "job4.txt" in jobs_summary and "has ``` fence" in excerpt
+        assert details_md.count("<details>") == 2
+        assert "Showing 2 of 4 files" in details_md
+    
+    @pytest.mark.asyncio
+    async def test_fallback_hint_sees_logs_past_excerpt_budget(self, temp_directory):
+        """Test that the fallback summary scans every file, not just the triager's budget."""
+        from scripts.triage_failure import EXCERPT_BUDGET, scan_logs, simple_summary
+        
+        line = "x" * 99 + "\n"
+        (temp_directory / "a_build.txt").write_text(line * (EXCERPT_BUDGET // len(line) + 100))
+        (temp_directory / "b_tests.txt").write_text("MemoryError\n")
+        
+        jobs_summary, excerpt, _ = await scan_logs(temp_directory, tail=0)
+        
+        assert len(excerpt) > EXCERPT_BUDGET
+        assert "out of memory" in simple_summary("CI", jobs_summary, excerpt, 0)
     
-    def test_collect_logs_nonexistent_directory(self):
+    def test_details_block_keeps_backticks_verbatim(self):
+        """Test that logs containing code fences get a longer fence instead of escaping."""
+        from scripts.triage_failure import _details_block
+        
+        block = _details_block(Path("job.txt"), "before\n```python\nx = 1\n```\nafter")
+        
+        assert "````text\nbefore\n```python\nx = 1\n```\nafter\n````" in block
+        assert "\\`" not in block
+    
+    @pytest.mark.asyncio
+    async def test_collect_logs_nonexistent_directory(self):
         """Test log collection with nonexistent directory."""
-        from scripts.triage_failure import collect_logs_excerpt
+        from scripts.triage_failure import scan_logs
         
         nonexistent_path = Path("/tmp/nonexistent_logs_dir")
-        jobs_summary, excerpt = collect_logs_excerpt(nonexistent_path, tail=10)
+        jobs_summary, excerpt, details_md = await scan_logs(nonexistent_path, tail=10)
         
         assert "not found" in jobs_summary.lower()
         assert "no logs available" in excerpt.lower()
+        assert "no logs directory" in details_md.lower()
+    
+    def test_find_log_files_walks_nested_directories(self, temp_logs_dir):
+        """Test that log discovery recurses and ignores other file types."""
+        from scripts.triage_failure import _find_log_files
+        
+        nested = temp_logs_dir / "build" / "1_Setup"
+        nested.mkdir(parents=True)
+        (nested / "step.log").write_text("ok")
+        (nested / "metadata.json").write_text("{}")
+        
+        files = [p.relative_to(temp_logs_dir).as_posix() for p in _find_log_files(temp_logs_dir)]
+        
+        assert files == ["build/1_Setup/step.log", "job1.txt", "job2.txt", "job3.log"]
+    
+    def test_read_tail_reads_only_needed_lines(self, temp_logs_dir):
+        """Test tailing large files, including lines longer than the initial window."""
+        from scripts.triage_failure import _read_tail
+        
+        big = temp_logs_dir / "big.log"
+        big.write_text("".join(f"line {i}\n" for i in range(100_000)))
+        wide = temp_logs_dir / "wide.log"
+        wide.write_text("".join(f"{i}:{'x' * 2000}\n" for i in range(10)))
+        
+        assert _read_tail(big, 3) == "line 99997\nline 99998\nline 99999"
+        assert _read_tail(wide, 2).splitlines()[0].startswith("8:")
+        assert _read_tail(temp_logs_dir / "job1.txt", 0) == "Error: Test failed\nStack trace here\nMore context"
     
     def test_simple_summary_generation(self):
         """Test fallback summary generation without LLMs."""
@@ -171,6 +287,11 @@ class TestTriageFailureScript:
         assert "Auto-Triage Summary" in summary
         assert "dependency issue" in summary  # Should detect pip-related issues
         assert jobs_summary in summary
+        
+        # Other signatures map to their own hints; unknown failures get the generic one
+        assert "out of memory" in simple_summary(workflow_name, jobs_summary, "Killed", 100)
+        assert "assertion" in simple_summary(workflow_name, jobs_summary, "E   AssertionError", 100)
+        assert "Check failing step" in simple_summary(workflow_name, jobs_summary, "collecting ... 3 items", 100)
     
     def test_tail_lines_function(self):
         """Test the tail_lines utility function."""
@@ -189,26 +310,51 @@ class TestTriageFailureScript:
         # Test tailing zero lines (Python slice behavior: [-0:] returns all)
         result = tail_lines(text, 0)
         assert result == text  # This is the actual behavior
+        
+        # Trailing newlines and CRLF line endings are normalized like splitlines()
+        assert tail_lines("a\nb\nc\n", 2) == "b\nc"
+        assert tail_lines("a\r\nb\r\nc\r\n", 2) == "b\nc"
+        assert tail_lines("", 3) == ""
+    
+    def test_clip_cuts_on_separator(self):
+        """Test that oversized body sections are trimmed at a separator within the budget."""
+        from scripts.triage_failure import _CLIPPED, _clip
+        
+        assert _clip("short", 100) == "short"
+        
+        text = "\n".join(f"line {i}" for i in range(100))
+        clipped = _clip(text, 200)
+        assert len(clipped) <= 200
+        assert clipped.startswith("line 0\n") and "(truncated)" in clipped
+        assert "line 99" not in clipped
+        
+        blocks = "\n".join(f"<details>{'x' * 40}</details>" for _ in range(10))
+        clipped = _clip(blocks, 200, sep="<details>")
+        assert clipped.count("<details>") == clipped.count("</details>")
+        
+        # A first block larger than the budget is dropped, not cut open
+        oversized = f"<details>\n\n```\n{'x' * 500}\n```\n\n</details>"
+        assert _clip(oversized, 200, sep="<details>") == _CLIPPED
     
     @pytest.mark.asyncio
-    async def test_triage_script_main_fallback(self, temp_logs_dir, mock_config):
+    async def test_triage_script_main_fallback(self, temp_logs_dir, mock_config_yaml):
         """Test main script execution with fallback mode (no LLM keys)."""
         from scripts.triage_failure import main_async
-        from unittest.mock import MagicMock
         
-        # Create mock args
-        args = MagicMock()
-        args.workflow_name = "test-workflow"
-        args.run_url = "https://github.com/test/repo/actions/runs/123"
-        args.git_ref = "refs/heads/main"
-        args.commit_sha = "abc123def456"
-        args.logs_root = str(temp_logs_dir)
-        args.tail_lines = 50
+        # Script arguments, as parse_args() would build them
+        args = argparse.Namespace(
+            workflow_name="test-workflow",
+            run_url="https://github.com/test/repo/actions/runs/123",
+            git_ref="refs/heads/main",
+            commit_sha="abc123def456",
+            logs_root=str(temp_logs_dir),
+            tail_lines=50
+        )
         
         # Mock environment to ensure no LLM keys
         with patch.dict('os.environ', {}, clear=True):
             with patch('scripts.triage_failure.Path') as mock_path:
-                with patch('builtins.open', mock_open(read_data=yaml.dump(mock_config))):
+                with patch('builtins.open', mock_open(read_data=mock_config_yaml)):
                     with patch('scripts.triage_failure.GitHubIntegration') as mock_gh_class:
                         mock_gh = mock_gh_class.return_value
                         mock_gh.get_repository_structure = AsyncMock(return_value={"tree": []})
@@ -229,23 +375,18 @@ class TestDockerBuild:
     
     def test_dockerfile_exists(self):
         """Test that Dockerfile exists and is valid."""
-        dockerfile_path = Path(__file__).parent.parent / "Dockerfile"
-        assert dockerfile_path.exists(), "Dockerfile not found"
+        assert DOCKERFILE.exists(), "Dockerfile not found"
         
-        with open(dockerfile_path, 'r') as f:
-            content = f.read()
+        content = DOCKERFILE.read_bytes().decode()
         
         # Basic Dockerfile validation
         assert content.strip(), "Dockerfile is empty"
         assert "FROM" in content, "Missing FROM instruction"
         assert "python" in content.lower(), "Should use Python base image"
     
-    def test_docker_build_step_in_ci_cd(self):
+    def test_docker_build_step_in_ci_cd(self, workflows):
         """Test that Docker build steps are present in CI/CD workflow."""
-        ci_cd_file = WORKFLOW_DIR / "ci-cd.yml"
-        
-        with open(ci_cd_file, 'r') as f:
-            workflow = yaml.safe_load(f)
+        workflow = workflows["ci-cd.yml"]
         
         docker_job = workflow["jobs"]["build-and-test-docker"]
         steps = [step.get("name", "") for step in docker_job["steps"]]
@@ -257,27 +398,20 @@ class TestDockerBuild:
 class TestWorkflowIntegration:
     """Test integration between different workflow components."""
     
-    def test_triage_workflow_references_correct_workflows(self):
+    def test_triage_workflow_references_correct_workflows(self, workflows):
         """Test that triage workflow monitors the correct workflows."""
-        triage_file = WORKFLOW_DIR / "triage-on-failure.yml"
-        
-        with open(triage_file, 'r') as f:
-            workflow = yaml.safe_load(f)
+        workflow = workflows["triage-on-failure.yml"]
         
         on_key = "on" if "on" in workflow else True
         monitored_workflows = workflow[on_key]["workflow_run"]["workflows"]
         
         # Should monitor key workflows
-        assert "ci-cd-pipeline" in monitored_workflows
-        assert "docs-build-deploy" in monitored_workflows
-        assert "evolve-on-issue" in monitored_workflows
+        missing = {"ci-cd-pipeline", "docs-build-deploy", "evolve-on-issue"}.difference(monitored_workflows)
+        assert not missing, f"Triage missing monitored workflows: {sorted(missing)}"
     
-    def test_workflow_failure_triage_integration(self):
+    def test_workflow_failure_triage_integration(self, workflows):
         """Test that workflows properly integrate with triage on failure."""
-        ci_cd_file = WORKFLOW_DIR / "ci-cd.yml"
-        
-        with open(ci_cd_file, 'r') as f:
-            workflow = yaml.safe_load(f)
+        workflow = workflows["ci-cd.yml"]
         
         test_job = workflow["jobs"]["test"]
         
@@ -288,15 +422,13 @@ class TestWorkflowIntegration:
         failure_step = failure_steps[0]
         assert "triage" in failure_step.get("name", "").lower()
     
-    def test_environment_variables_consistency(self):
+    def test_environment_variables_consistency(self, workflows):
         """Test that required environment variables are used consistently."""
-        workflow_files = list(WORKFLOW_DIR.glob("*.yml"))
-        
         required_env_vars = ["GITHUB_TOKEN", "GH_TOKEN"]
         
-        for workflow_file in workflow_files:
-            with open(workflow_file, 'r') as f:
-                content = f.read()
+        for workflow_file, workflow in workflows.items():
+            # Keys and values of the parsed workflow, so comments don't count
+            content = "\n".join(_iter_strings(workflow))
             
             # If the workflow mentions GitHub operations, it should have tokens
             if "gh " in content or "github" in content.lower():
@@ -312,15 +444,12 @@ class TestWorkflowIntegration:
 class TestWorkflowSecurity:
     """Test security aspects of workflows."""
     
-    def test_workflow_permissions_specified(self):
+    def test_workflow_permissions_specified(self, workflows):
         """Test that workflows specify appropriate permissions."""
         sensitive_workflows = ["ci-cd.yml", "triage-on-failure.yml", "evolve-on-issue.yml"]
         
         for workflow_name in sensitive_workflows:
-            workflow_file = WORKFLOW_DIR / workflow_name
-            
-            with open(workflow_file, 'r') as f:
-                workflow = yaml.safe_load(f)
+            workflow = workflows[workflow_name]
             
             assert "permissions" in workflow, f"Missing permissions in {workflow_name}"
             
@@ -331,57 +460,36 @@ class TestWorkflowSecurity:
             if "contents" in permissions:
                 assert permissions["contents"] in ["read", "write"], f"Invalid contents permission in {workflow_name}"
     
-    def test_no_hardcoded_secrets(self):
+    def test_no_hardcoded_secrets(self, workflow_sources):
         """Test that workflows don't contain hardcoded secrets."""
-        sensitive_patterns = ["password", "secret", "token", "key"]
-        # Exclude lines that reference variables, secrets, or are comments
-        excluded_patterns = [
-            "${{", "secrets.", "GITHUB_TOKEN", "github.token", "github_token=", 
-            "OPENAI_API_KEY", "ANTHROPIC_API_KEY", "id-token:", "token:", 
-            "contents:", "issues:", "actions:", "pages:"
-        ]
-        # Regex: sensitive word, optional whitespace, colon or =, optional whitespace, value (not starting with ${{ or secrets.)
-        assignment_regexes = [
-            re.compile(rf"^\s*[^#]*\b{pattern}\b\s*[:=]\s*([^\s#]+)", re.IGNORECASE)
-            for pattern in sensitive_patterns
-        ]
-        
-        for workflow_file in WORKFLOW_DIR.glob("*.yml"):
-            with open(workflow_file, 'r') as f:
-                lines = f.readlines()
-            
-            for i, line in enumerate(lines, 1):
+        for workflow_file, content in workflow_sources.items():
+            # Only lines with a candidate assignment get the per-line checks
+            for match in _SECRET_ASSIGNMENT_RE.finditer(content):
+                line_end = content.find("\n", match.end())
+                line = content[match.start():line_end if line_end != -1 else None]
                 line_lower = line.lower()
-                # Skip comments and excluded patterns
-                if line_lower.strip().startswith("#") or any(excluded in line_lower for excluded in excluded_patterns):
+                # Variable references, expressions and excluded patterns are fine
+                if match.group(2).startswith(("${{", "secrets.")) or any(
+                    excluded in line_lower for excluded in _SECRET_EXCLUDED
+                ):
                     continue
-                for regex in assignment_regexes:
-                    match = regex.search(line)
-                    if match:
-                        value = match.group(1)
-                        # Exclude variable references or expressions
-                        if value.startswith("${{") or value.startswith("secrets."):
-                            continue
-                        pytest.fail(f"Potential hardcoded secret in {workflow_file} (line {i}): {line.strip()}")
+                line_number = content.count("\n", 0, match.start()) + 1
+                pytest.fail(f"Potential hardcoded secret in {workflow_file} (line {line_number}): {line.strip()}")
+
+
 class TestWorkflowPerformance:
     """Test workflow performance and efficiency."""
     
-    def test_workflow_uses_caching(self):
+    def test_workflow_uses_caching(self, workflow_sources):
         """Test that workflows use appropriate caching."""
-        ci_cd_file = WORKFLOW_DIR / "ci-cd.yml"
-        
-        with open(ci_cd_file, 'r') as f:
-            content = f.read()
+        content = workflow_sources["ci-cd.yml"]
         
         # Should use pip caching
         assert "cache: 'pip'" in content, "CI/CD workflow should use pip caching"
     
-    def test_workflow_matrix_strategy(self):
+    def test_workflow_matrix_strategy(self, workflows):
         """Test that CI workflow uses matrix strategy appropriately."""
-        ci_cd_file = WORKFLOW_DIR / "ci-cd.yml"
-        
-        with open(ci_cd_file, 'r') as f:
-            workflow = yaml.safe_load(f)
+        workflow = workflows["ci-cd.yml"]
         
         test_job = workflow["jobs"]["test"]
         assert "strategy" in test_job, "Test job should use matrix strategy"
@@ -0,0 +1,40 @@
+"""
+Cached loading of YAML configuration files.
+
+Parsed configurations are memoized per (path, modification time), so a
+long-lived process that loads the same seed configuration repeatedly only
+parses it again after the file changes.
+"""
+
+import copy
+import os
+from functools import lru_cache
+from typing import Any, Dict, Union
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+
+@lru_cache(maxsize=8)
+def _load(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a YAML file; mtime_ns only takes part in the cache key."""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_SafeLoader)
+
+
+def load_config(path: Union[str, os.PathLike]) -> Dict[str, Any]:
+    """
+    Load a YAML configuration file, reusing the parsed result while it is unchanged.
+    
+    Args:
+        path: Path to the YAML file
+        
+    Returns:
+        Dict[str, Any]: A private copy of the parsed configuration, safe to mutate
+    """
+    path = os.path.abspath(path)
+    return copy.deepcopy(_load(path, os.stat(path).st_mtime_ns))
@@ -5,16 +5,50 @@ This module provides standardized logging setup for the entire application,
 ensuring consistent log formatting and levels across all components.
 """
 
+import atexit
+import functools
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Optional
 
+# Records from every configured logger; a single listener thread writes them out
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+
+# Level names resolved once; unknown names fall back to INFO
+_LEVELS = logging.getLevelNamesMapping()
+
+# Shared by every handler the listener owns
+_FORMATTER = logging.Formatter(
+    fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+
+def _get_listener() -> QueueListener:
+    """Start the shared queue listener (console output) on first use."""
+    global _listener
+    if _listener is None:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(_FORMATTER)
+        _listener = QueueListener(_log_queue, console_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+    return _listener
+
 
 def setup_logger(name: str, level: str = "INFO", log_file: Optional[str] = None) -> logging.Logger:
     """
     Set up a logger with standardized configuration.
     
+    The logger itself only has a QueueHandler: logging calls put the record on
+    a queue and return, and one background listener thread formats and writes
+    all records to the console (and log files), so callers - including
+    coroutines on the event loop - never block on that I/O.
+    
     Args:
         name: Logger name (typically __name__ from calling module)
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -23,27 +57,22 @@ def setup_logger(name: str, level: str = "INFO", log_file: Optional[str] = None)
     Returns:
         logging.Logger: Configured logger instance
     """
+    return _make_logger(name, level, log_file)
+
+
+@functools.lru_cache(maxsize=None)
+def _make_logger(name: str, level: str, log_file: Optional[str]) -> logging.Logger:
+    """Configure a logger once per (name, level, log_file); repeat calls are a cache hit."""
     logger = logging.getLogger(name)
     
-    # Prevent duplicate handlers
+    # Prevent duplicate handlers (same name, different level or file)
     if logger.handlers:
         return logger
     
     # Set log level
-    numeric_level = getattr(logging, level.upper(), logging.INFO)
-    logger.setLevel(numeric_level)
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    logger.setLevel(_LEVELS.get(level.upper(), logging.INFO))
     
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    console_handler.setLevel(numeric_level)
-    logger.addHandler(console_handler)
+    listener = _get_listener()
     
     # File handler (if specified)
     if log_file:
@@ -51,10 +80,12 @@ def setup_logger(name: str, level: str = "INFO", log_file: Optional[str] = None)
         log_path.parent.mkdir(parents=True, exist_ok=True)
         
         file_handler = logging.FileHandler(log_path)
-        file_handler.setFormatter(formatter)
-        file_handler.setLevel(numeric_level)
-        logger.addHandler(file_handler)
+        file_handler.setFormatter(_FORMATTER)
+        # The listener is shared, so the file only takes this logger's records
+        file_handler.addFilter(logging.Filter(name))
+        listener.handlers += (file_handler,)
     
+    logger.addHandler(QueueHandler(_log_queue))
     return logger
 
 
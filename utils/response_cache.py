@@ -0,0 +1,77 @@
+"""
+Persistent cache for LLM responses keyed by normalized input.
+
+CI failures tend to recur with only volatile details changed (timestamps,
+durations, commit hashes, temp paths). Normalizing those away before hashing
+lets a repeated failure reuse an earlier report instead of a new LLM call.
+Other numbers (exit codes, line numbers, assertion values) stay in the key,
+since they tell one failure from another.
+"""
+
+import hashlib
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+# ANSI escapes, timestamps, durations, hex ids with letters and digits
+# (commit SHAs), addresses and temp paths
+_VOLATILE = re.compile(
+    r"\x1b\[[0-9;]*[A-Za-z]"
+    r"|\b\d{4}-\d{2}-\d{2}[t ][\d:.]+z?"
+    r"|\b\d+(?:\.\d+)?m?s\b"
+    r"|\b(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{7,40}\b"
+    r"|0x[0-9a-f]+"
+    r"|/tmp/\S+"
+)
+
+
+def normalize(text: str) -> str:
+    """Reduce text to a signature that is stable across repeats of the same failure."""
+    return " ".join(_VOLATILE.sub("#", text.lower()).split())
+
+
+class ResponseCache:
+    """SQLite-backed store of LLM responses, looked up by normalized prompt input."""
+
+    def __init__(self, path: str, ttl_seconds: float):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite file location; parent directories are created
+            ttl_seconds: Age after which a cached response is ignored
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def _key(self, namespace: str, text: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{normalize(text)}".encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, text: str) -> Optional[str]:
+        """Return the cached response for text, or None if missing or expired."""
+        row = self._db.execute(
+            "SELECT response, created_at FROM responses WHERE key = ?",
+            (self._key(namespace, text),)
+        ).fetchone()
+        if row and time.time() - row[1] < self.ttl_seconds:
+            return row[0]
+        return None
+
+    def set(self, namespace: str, text: str, response: str) -> None:
+        """Store a response for text, replacing any previous entry."""
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                (self._key(namespace, text), response, time.time())
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._db.close()